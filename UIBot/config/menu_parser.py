@@ -9,16 +9,28 @@ from __future__ import division
 from __future__ import print_function
 
 # Import built-in modules
+import __main__
 from collections import defaultdict
+from functools import partial
 
 # Import third-party modules
+from UIBot import Command
 from UIBot import UIParser
+from UIBot import register_parser
 from maya import cmds
 from maya import mel
+import six
 
 
+@register_parser
 class MenuParser(UIParser):
     TYPE = "menu"
+    # NOTE the menu bar, the menu and action definitions
+    SUBTREES = [
+        ("widget", "Menu_Bar", "QMenuBar"),
+        ("widget", None, "QMenu"),
+        ("action", None, None),
+    ]
     SCRIPT_FLAG = [
         "c",
         "command",
@@ -32,6 +44,15 @@ class MenuParser(UIParser):
         "optionBoxCommand",
     ]
 
+    # NOTE flags cannot change by the edit mode
+    STRUCTURE_FLAG = [
+        "divider",
+        "lazy",
+        "optionBox",
+        "optionBoxIcon",
+        "optionBoxCommand",
+    ]
+
     MAPPING = {
         "tearOff": "tearOffEnabled",
         "label": "title",
@@ -39,10 +60,10 @@ class MenuParser(UIParser):
         "image": "icon",
     }
 
-    def __init__(self, root, py_dict):
-        super(MenuParser, self).__init__(root, py_dict)
-        self.menu_dict = []
-        self.action_dict = []
+    def __init__(self, root, py_dict, index=None):
+        super(MenuParser, self).__init__(root, py_dict, index)
+        self.menu_dict = {}
+        self.action_dict = {}
 
     def parse(self, element):
         # NOTES(timmyliang) action attrs
@@ -73,48 +94,99 @@ class MenuParser(UIParser):
 
         return menu_list
 
-    def create_ui(self, tree, parent):
-        ui_set = set()
-        for data in tree:
-            object_name = data.get("object_name", "")
-            config = data.get("config", {})
-            cls = data.get("class", "QAction")
-
-            if cls == "QMenu":
-                if parent == "MayaWindow":
-                    menu = cmds.menu(object_name, parent=parent, **config)
-                else:
-                    menu = cmds.menuItem(object_name, parent=parent, sm=1, **config)
-                ui_set.add(menu)
-                ui_set.update(self.create_ui(data.get("items", []), menu))
-            if cls == "QAction":
-                option_box = config.pop("optionBox", None)
-                option_box_icon = config.pop("optionBoxIcon", None)
-                option_box_command = config.pop("optionBoxCommand", None)
-                action = cmds.menuItem(object_name, parent=parent, **config)
-                ui_set.add(action)
-
-                if option_box:
-                    config = {"optionBox": option_box}
-                    if not option_box_icon is None:
-                        config["optionBoxIcon"] = option_box_icon
-                    if not option_box_command is None:
-                        config["command"] = option_box_command
-                    action = cmds.menuItem(object_name, parent=parent, **config)
-                    ui_set.add(action)
-        return ui_set
-
-    def register(self):
-        path = ".//widget[@class='QMenu']"
-        self.menu_dict = {m.attrib.get("name"): m for m in self.root.findall(path)}
-        path = ".//action"
-        self.action_dict = {a.attrib.get("name"): a for a in self.root.findall(path)}
-        bar = self.root.find(".//widget[@class='QMenuBar'][@name='Menu_Bar']")
-        tree = self.parse(bar)
-        # return []
-        # NOTES(timmyliang) dump tree data for debuging
-        # with open(os.path.join(DIR, "data.json"), "w") as f:
-        #     json.dump(tree, f, ensure_ascii=False, indent=4)
-
-        maya_window = mel.eval("$_=$gMainWindow")
-        return self.create_ui(tree, maya_window)
+    def can_insert(self, parent):
+        # NOTE top level menu always append to the menu bar
+        return parent is not None
+
+    def can_edit(self, state, data):
+        config = state.get("config", {})
+        new_config = data.get("config", {})
+        for flag in self.STRUCTURE_FLAG:
+            if config.get(flag) != new_config.get(flag):
+                return False
+        return super(MenuParser, self).can_edit(state, data)
+
+    def exists(self, state):
+        ui_list = state.get("ui")
+        return bool(ui_list) and all(cmds.menu(ui, ex=1) for ui in ui_list)
+
+    def is_lazy(self, data):
+        return data.get("class") == "QMenu" and data["config"].get("lazy", False)
+
+    def get_kind(self, data, parent=None):
+        is_top = parent is None and data.get("class") == "QMenu"
+        return "menu" if is_top else "menuItem"
+
+    def post_menu(self, state, command, *args):
+        """postMenuCommand hook to create the lazy submenu on first open"""
+        self.materialize(state)
+        if callable(command):
+            command(*args)
+        elif command:
+            six.exec_(command, __main__.__dict__)
+
+    def hook_post_menu(self, state, config):
+        command = config.pop("pmc", None) or config.get("postMenuCommand")
+        hook = partial(self.post_menu, state, command)
+        # NOTE the mel backend register the hook of the kept state once
+        hook.ident = ("post_menu", id(state))
+        config["postMenuCommand"] = hook
+        return config
+
+    def emit_item(self, data, parent=None, after=None):
+        commands = []
+        object_name = data.get("object_name", "")
+        config = self.get_config(data)
+        cls = data.get("class", "QAction")
+        if config.pop("lazy", False) and cls == "QMenu":
+            config = self.hook_post_menu(data, config)
+        is_top = parent is None
+        parent = parent if parent else mel.eval("$_=$gMainWindow")
+        if not is_top and after is not None:
+            config["insertAfter"] = after
+        config["parent"] = parent
+        command = partial(Command, args=[object_name], scripts=self.SCRIPT_FLAG)
+
+        if cls == "QMenu":
+            if is_top:
+                commands.append(command("menu", flags=config))
+            else:
+                config["sm"] = 1
+                commands.append(command("menuItem", flags=config))
+        if cls == "QAction":
+            option_box = config.pop("optionBox", None)
+            option_box_icon = config.pop("optionBoxIcon", None)
+            option_box_command = config.pop("optionBoxCommand", None)
+            action = command("menuItem", flags=config)
+            commands.append(action)
+
+            if option_box:
+                config = {"parent": parent, "optionBox": option_box}
+                if not option_box_icon is None:
+                    config["optionBoxIcon"] = option_box_icon
+                if not option_box_command is None:
+                    config["command"] = option_box_command
+                if not is_top:
+                    config["insertAfter"] = action
+                commands.append(command("menuItem", flags=config))
+        return commands
+
+    def edit_item(self, state, changes, parent=None):
+        config = self.parse_icon_flag(dict(changes))
+        config = self.parse_script_flag(config, state.get("object_name"))
+        is_post_menu = "pmc" in config or "postMenuCommand" in config
+        if is_post_menu and self.is_lazy(state):
+            config = self.hook_post_menu(state, config)
+        ui_name = state["ui"][0]
+        if parent is None and state.get("class") == "QMenu":
+            cmds.menu(ui_name, e=1, **config)
+        else:
+            cmds.menuItem(ui_name, e=1, **config)
+
+    def extract(self):
+        menus = self.index.findall("QMenu")
+        self.menu_dict = {m.attrib.get("name"): m for m in menus}
+        actions = self.index.tags.get("action", [])
+        self.action_dict = {a.attrib.get("name"): a for a in actions}
+        bar = self.index.find("Menu_Bar", "QMenuBar")
+        return self.parse(bar) if bar is not None else []
@@ -8,14 +8,23 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+# Import built-in modules
+import hashlib
+import json
+
 # Import third-party modules
+from UIBot import Command
+from UIBot import Operation
 from UIBot import UIParser
+from UIBot import register_parser
 from maya import cmds
 from maya import mel
 
 
+@register_parser
 class ShelfParser(UIParser):
     TYPE = "shelf"
+    SUBTREES = [("widget", "Shelf_Wgt", "QTabWidget")]
     SCRIPT_FLAG = [
         "c",
         "command",
@@ -37,12 +46,11 @@ class ShelfParser(UIParser):
         "label": "tooltip",
         "image1": "icon",
     }
+    # NOTE save the shelf preference once after the registration
+    SAVE_PENDING = False
 
     def parse(self, element):
-        ui_set = set()
-        layout = mel.eval("""$_=$gShelfTopLevel""")
-        layout_path = cmds.shelfTabLayout(layout, q=1, fpn=1)
-        labels = cmds.shelfTabLayout(layout, q=1, tl=1)
+        tree = []
         for shelf in element.findall("widget"):
             object_name = shelf.attrib.get("name")
             if object_name.lower().startswith("stub"):
@@ -54,28 +62,200 @@ class ShelfParser(UIParser):
             if not title:
                 continue
 
-            # NOTE delete shelf before create
-            if title in labels:
-                cmds.deleteUI("%s|%s" % (layout_path, title))
-            ui_shelf = mel.eval("""$_=addNewShelfTab("%s")""" % title)
-            ui_set.add(ui_shelf)
-            # NOTE clear extra button
-            for child in cmds.shelfLayout(ui_shelf, q=1, ca=1) or []:
-                cmds.deleteUI(child)
-
+            items = []
             layout = shelf.find("layout")
             for item in layout.findall("./item/widget"):
                 object_name = item.attrib.get("name")
                 if object_name.lower().startswith("stub"):
                     continue
                 config = self.parse_properties(item)
-                config["parent"] = ui_shelf
-                button = cmds.shelfButton(**config)
-                ui_set.add(button)
-        return ui_set
-
-    def register(self):
-        path = ".//widget[@class='QTabWidget'][@name='Shelf_Wgt']"
-        element = self.root.find(path)
-        ui_set = self.parse(element)
-        return ui_set
+                data = {"object_name": object_name, "class": "QToolButton"}
+                data["config"] = config
+                items.append(data)
+
+            tree.append(
+                {
+                    "object_name": shelf.attrib.get("name"),
+                    "class": "QWidget",
+                    "config": {"title": title},
+                    "items": items,
+                }
+            )
+        return tree
+
+    def can_insert(self, parent):
+        # NOTE the buttons append to the shelf, the shelf reorder them at last
+        return parent is not None
+
+    def can_edit(self, state, data):
+        # NOTE shelf title is the shelf layout name
+        if state.get("class") == "QWidget":
+            return state.get("config") == data.get("config")
+        return super(ShelfParser, self).can_edit(state, data)
+
+    def exists(self, state):
+        ui_list = state.get("ui")
+        return bool(ui_list) and all(cmds.shelfLayout(ui, ex=1) for ui in ui_list)
+
+    def get_kind(self, data, parent=None):
+        return "layout" if data.get("class") == "QWidget" else "control"
+
+    @staticmethod
+    def get_tag(data):
+        """docTag of the shelf button, match the button in the saved shelf"""
+        text = json.dumps(data.get("config", {}), sort_keys=True)
+        digest = hashlib.md5(text.encode("utf-8")).hexdigest()[:8]
+        return "%s:%s" % (data.get("object_name", ""), digest)
+
+    @staticmethod
+    def get_shelf_path():
+        layout = mel.eval("""$_=$gShelfTopLevel""")
+        layout_path = cmds.shelfTabLayout(layout, q=1, fpn=1)
+        labels = cmds.shelfTabLayout(layout, q=1, tl=1) or []
+        return layout, layout_path, labels
+
+    def adopt(self, data, layout_path):
+        """adopt
+        take over the shelf restored from the preference with the same title,
+        the buttons with the same docTag are kept, the others are edited,
+        the script flags are always applied again
+
+        :param data: extracted shelf data
+        :type data: dict
+        :param layout_path: full path of the shelf tab layout
+        :type layout_path: str
+        :return: shelf state
+        :rtype: dict
+        """
+        ui_shelf = "%s|%s" % (layout_path, data["config"]["title"])
+        tag_dict = {self.get_tag(item): item for item in data.get("items", [])}
+        items = []
+        for child in cmds.shelfLayout(ui_shelf, q=1, ca=1) or []:
+            ui = "%s|%s" % (ui_shelf, child)
+            try:
+                tag = cmds.shelfButton(ui, q=1, docTag=1) or ""
+            except RuntimeError:
+                # NOTE separator or other control, delete it by the reconcile
+                tag = ""
+            item = tag_dict.get(tag)
+            # NOTE the saved commands of the python callbacks are session only
+            config = {}
+            if item:
+                config = item["config"]
+                config = {k: v for k, v in config.items() if k not in self.SCRIPT_FLAG}
+            items.append(
+                {
+                    "object_name": tag.rpartition(":")[0],
+                    "class": "QToolButton",
+                    # NOTE empty config edit all the flags of the outdated button
+                    "config": config,
+                    "ui": [ui],
+                    "kind": "control",
+                }
+            )
+        return {
+            "object_name": data.get("object_name"),
+            "class": "QWidget",
+            "config": dict(data["config"]),
+            "ui": [ui_shelf],
+            "kind": "layout",
+            "items": items,
+        }
+
+    def plan(self, tree, states=None):
+        states = [state for state in states or [] if self.exists(state)]
+        titles = set(state.get("config", {}).get("title") for state in states)
+        pending = [data for data in tree if data["config"]["title"] not in titles]
+        if pending:
+            _, layout_path, labels = self.get_shelf_path()
+            for data in pending:
+                if data["config"]["title"] in labels:
+                    states.append(self.adopt(data, layout_path))
+        new_states, operations = self.reconcile(states, tree)
+        if operations:
+            self.save_preference()
+        return new_states, operations
+
+    def reconcile(self, states, tree, parent=None, depth=0):
+        res = super(ShelfParser, self).reconcile(states, tree, parent, depth)
+        new_states, operations = res
+        if parent is not None:
+            return new_states, operations
+
+        # NOTE the new buttons append to the kept shelf, reorder them at last
+        creates = [op for op in operations if op.action == Operation.CREATE]
+        created = set(id(op.state) for op in creates)
+        for state in new_states:
+            if id(state) in created:
+                continue
+            if any(id(item) in created for item in state.get("items", [])):
+                changes = {"order": True}
+                op = Operation(Operation.EDIT, self, state, changes=changes)
+                op.depth = depth + 2
+                op.top = state.get("object_name")
+                operations.append(op)
+        return new_states, operations
+
+    @classmethod
+    def save_preference(cls):
+        if cls.SAVE_PENDING:
+            return
+        cls.SAVE_PENDING = True
+        cmds.evalDeferred(cls.save_shelves, lp=1)
+
+    @classmethod
+    def save_shelves(cls):
+        cls.SAVE_PENDING = False
+        mel.eval("""saveAllShelves $gShelfTopLevel""")
+
+    def emit_item(self, data, parent=None, after=None):
+        # NOTE the shelf tab need to check the existing one, create it directly
+        if not parent:
+            return None
+        config = self.get_config(data)
+        config["parent"] = parent
+        config["docTag"] = self.get_tag(data)
+        return [Command("shelfButton", flags=config, scripts=self.SCRIPT_FLAG)]
+
+    def create_item(self, data, parent=None, after=None):
+        if parent:
+            return super(ShelfParser, self).create_item(data, parent, after)
+
+        layout, layout_path, labels = self.get_shelf_path()
+        title = data["config"]["title"]
+
+        # NOTE delete shelf before create
+        if title in labels:
+            cmds.deleteUI("%s|%s" % (layout_path, title))
+        # NOTE skip addNewShelfTab, it write the preference for every shelf
+        return [cmds.shelfLayout(title, parent=layout)]
+
+    def reorder(self, state):
+        """move the out of order buttons with the 1-based position"""
+        ui_shelf = state["ui"][0]
+        children = cmds.shelfLayout(ui_shelf, q=1, ca=1) or []
+        names = [
+            ui.split("|")[-1] for item in state.get("items", []) for ui in item["ui"]
+        ]
+        for position, name in enumerate(names, 1):
+            if name not in children:
+                continue
+            if position <= len(children) and children[position - 1] == name:
+                continue
+            cmds.shelfLayout(ui_shelf, e=1, position=(name, position))
+            children.remove(name)
+            children.insert(position - 1, name)
+
+    def edit_item(self, state, changes, parent=None):
+        if state.get("class") == "QWidget":
+            self.reorder(state)
+            return
+        config = self.parse_icon_flag(dict(changes))
+        config = self.parse_script_flag(config, state.get("object_name"))
+        config["docTag"] = self.get_tag(state)
+        for ui_name in state.get("ui", []):
+            cmds.shelfButton(ui_name, e=1, **config)
+
+    def extract(self):
+        element = self.index.find("Shelf_Wgt", "QTabWidget")
+        return self.parse(element) if element is not None else []
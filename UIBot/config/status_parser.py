@@ -10,15 +10,18 @@ from __future__ import print_function
 
 # Import third-party modules
 from UIBot import UIParser
+from UIBot import register_parser
 from maya import cmds
 from maya import mel
 
 
+@register_parser
 class StatusParser(UIParser):
     TYPE = "status"
+    SUBTREES = []
 
     def parse(self, element):
         pass
 
-    def register(self):
+    def emit_item(self, data, parent=None, after=None):
         return []
@@ -9,13 +9,17 @@ from __future__ import division
 from __future__ import print_function
 
 # Import third-party modules
+from UIBot import Command
 from UIBot import UIParser
+from UIBot import register_parser
 from maya import cmds
 from maya import mel
 
 
+@register_parser
 class ToolBoxParser(UIParser):
     TYPE = "toolbox"
+    SUBTREES = [("widget", "Tool_Box_Group", "QGroupBox")]
     SCRIPT_FLAG = [
         "c",
         "command",
@@ -39,21 +43,28 @@ class ToolBoxParser(UIParser):
     }
 
     def parse(self, element):
-        ui_set = set()
-        toolbox = mel.eval("$_=$gToolBox")
+        tree = []
         for child in element.findall("./layout/item/widget"):
             object_name = child.attrib.get("name")
             if object_name.lower().startswith("stub"):
                 continue
             config = self.parse_properties(child)
-            config["parent"] = toolbox
-            button = cmds.iconTextButton(**config)
-            ui_set.add(button)
+            tree.append(
+                {"object_name": object_name, "class": "QToolButton", "config": config}
+            )
+        return tree
 
-        return ui_set
+    def emit_item(self, data, parent=None, after=None):
+        config = self.get_config(data)
+        config["parent"] = parent if parent else mel.eval("$_=$gToolBox")
+        return [Command("iconTextButton", flags=config, scripts=self.SCRIPT_FLAG)]
 
-    def register(self):
-        path = ".//widget[@class='QGroupBox'][@name='Tool_Box_Group']"
-        element = self.root.find(path)
-        ui_set = self.parse(element)
-        return ui_set
+    def edit_item(self, state, changes, parent=None):
+        config = self.parse_icon_flag(dict(changes))
+        config = self.parse_script_flag(config, state.get("object_name"))
+        for ui_name in state.get("ui", []):
+            cmds.iconTextButton(ui_name, e=1, **config)
+
+    def extract(self):
+        element = self.index.find("Tool_Box_Group", "QGroupBox")
+        return self.parse(element) if element is not None else []
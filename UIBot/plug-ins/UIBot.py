@@ -16,6 +16,24 @@ refresh register path
 set type to load after plugin initialize | "" means load nothing
 -w : -widget [string]
 get register ui data
+-c : -cache [string]
+invalidate the parsed ui cache | "all" (also rescan the folders) or a ui file path
+query return the cache statistics as json string
+-b : -budget [float]
+milliseconds of each idle slice to create the ui after plugin initialize
+0 means create all the ui at once
+-pg : -progress
+query the time sliced registration progress as json string
+-pf : -profile
+query the timing spans of the last registration as json string
+-tr : -trace [string]
+chrome trace event json path to write after registration | "" means disable
+-f : -file [string]
+only register, deregister or get the widgets of the ui file
+query return the registered ui file list
+-wt : -watch [float]
+seconds between polling the changed config files, reload them after maya startup
+0 means disable
 -h : -help
 display this help
 
@@ -26,8 +44,26 @@ cmds.UIBot(r="all")
 # NOTE query the register ui type list
 cmds.UIBot(q=1,w=1)
 # Result: [u'status', u'menu', u'shelf', u'toolbox'] #
+# NOTE get the menu ui of a single ui file, deregister the file only
+cmds.UIBot(w="menu", f="D:/config/UIBot.ui")
+cmds.UIBot(d="all", f="D:/config/UIBot.ui")
 # NOTE deregister menu ui
 cmds.UIBot(d="menu")
+# NOTE query the parsed ui cache statistics
+json.loads(cmds.UIBot(q=1,c=1))
+# Result: {u'hit': 1, u'miss': 0, u'write': 0, u'error': 0, u'invalidate': 0} #
+# NOTE invalidate the parsed ui cache
+cmds.UIBot(c="all")
+# NOTE create the ui in 10ms slices on the next maya startup
+cmds.UIBot(b=10)
+json.loads(cmds.UIBot(q=1,pg=1))
+# Result: {u'total': 9, u'done': 9, u'pending': 0, u'running': False} #
+# NOTE query the phase timing in milliseconds
+json.loads(cmds.UIBot(q=1,pf=1))["xml parse"]["duration"]
+# NOTE open the trace file in chrome://tracing
+cmds.UIBot(tr="D:/UIBot_trace.json")
+# NOTE reload the changed ui and parser files, check every 2 seconds
+cmds.UIBot(wt=2)
 """
 
 # Import future modules
@@ -36,24 +72,56 @@ from __future__ import division
 from __future__ import print_function
 
 # Import built-in modules
+import __main__
 import abc
+import argparse
+from collections import OrderedDict
 from collections import defaultdict
+from collections import deque
+from contextlib import contextmanager
 from functools import partial
-from functools import wraps
 import glob
+import hashlib
 import imp
-from itertools import chain
 import json
+import marshal
+import mmap
+from multiprocessing.pool import ThreadPool
 import os
+import shutil
+from stat import S_ISREG
+import struct
 import sys
+import tempfile
+import threading
 import time
+import traceback
 from xml.sax.saxutils import unescape
+import zlib
 
 # Import third-party modules
 from maya import OpenMaya
 from maya import OpenMayaMPx
 from maya import cmds
+from maya import mel
+from maya import utils
 import six
+from six.moves import intern
+
+# Import local modules
+from uibot_prefetch import PREFETCHER
+
+
+try:
+    # Import built-in modules
+    from os import scandir
+except ImportError:
+    try:
+        # NOTE python 2 use the scandir backport if installed
+        # Import third-party modules
+        from scandir import scandir
+    except ImportError:
+        scandir = None
 
 
 try:
@@ -81,23 +149,22 @@ nestdict = lambda: defaultdict(nestdict)
 PLUGIN_NAME = "UIBot"
 __file__ = globals().get("__file__")
 __file__ = __file__ or cmds.pluginInfo(PLUGIN_NAME, q=1, p=1)
+# NOTE the parser modules import the plugin as `UIBot`
+if __name__ in sys.modules:
+    sys.modules[PLUGIN_NAME] = sys.modules[__name__]
 DIR = os.path.dirname(os.path.abspath(__file__))
 ROOT = os.path.dirname(DIR)
 config_folder = os.path.join(ROOT, "config")
-
-
-def log_time(func=None, msg="elapsed time:"):
-    if not func:
-        return partial(log_time, msg=msg)
-
-    @wraps(func)
-    def wrapper(*args, **kwargs):
-        curr = time.time()
-        res = func(*args, **kwargs)
-        print(msg, time.time() - curr)
-        return res
-
-    return wrapper
+CACHE_DIR = os.getenv("MAYA_UIBOT_CACHE_PATH") or os.path.join(
+    os.path.expanduser("~"), ".%s" % PLUGIN_NAME
+)
+# NOTE bump when the parser-neutral data layout changed
+IR_VERSION = 3
+# NOTE python file with the suffix define the UIParser
+PARSER_SUFFIX = "_parser"
+# NOTE text => decoded json config, the same config repeat in many items
+JSON_CACHE = {}
+JSON_CACHE_SIZE = 4096
 
 
 def byteify(data):
@@ -117,14 +184,1518 @@ def byteify(data):
         return data
 
 
+def intern_text(text):
+    # NOTE python 2 cannot intern the unicode
+    return intern(text) if isinstance(text, str) else text
+
+
+def decode_json(text):
+    """decode the json text once, the result is shared and must not be modified"""
+    value = JSON_CACHE.get(text)
+    if value is None:
+        value = byteify(json.loads(text))
+        if len(JSON_CACHE) >= JSON_CACHE_SIZE:
+            JSON_CACHE.clear()
+        JSON_CACHE[text] = value
+    return value
+
+
+def decode_text(element):
+    # NOTE the iconset path may be in the normaloff child
+    value = element.text
+    if not value or not value.strip():
+        value = next((text for text in element.itertext() if text.strip()), "")
+    return intern_text(value)
+
+
+def decode_list(element):
+    return [decode_text(child) for child in element]
+
+
+def decode_set(element):
+    return [intern_text(text) for text in (element.text or "").split("|") if text]
+
+
+def decode_size(element):
+    return [int(element.findtext("width")), int(element.findtext("height"))]
+
+
+class Profiler(object):
+    """
+    hierarchical timing spans, optionally dump as chrome trace events
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.main = threading.current_thread().ident
+        self.main_stack = []
+        self.tree = {}
+        self.events = []
+        self.trace_path = os.getenv("MAYA_UIBOT_TRACE", "")
+
+    def reset(self):
+        with self.lock:
+            self.tree = {}
+            self.events = []
+
+    def get_stack(self):
+        stack = getattr(self.local, "stack", None)
+        if stack is None:
+            is_main = threading.current_thread().ident == self.main
+            stack = self.main_stack if is_main else []
+            self.local.stack = stack
+        return stack
+
+    def get_path(self):
+        stack = self.get_stack()
+        if stack is self.main_stack:
+            return list(stack)
+        # NOTE span in the worker thread belong to the main thread span
+        return self.main_stack + stack
+
+    def add(self, names, duration, start=None):
+        """add
+
+        :param names: span names under the current span
+        :type names: list
+        :param duration: elapsed seconds
+        :type duration: float
+        :param start: start time for the trace event, defaults to None
+        :type start: float, optional
+        """
+        parents = self.get_path()
+        path = parents + list(names)
+        with self.lock:
+            children = self.tree
+            for index, name in enumerate(path):
+                node = children.setdefault(
+                    name, {"duration": 0.0, "count": 0, "children": {}}
+                )
+                children = node["children"]
+                # NOTE the opened span add its own duration on exit
+                if index >= len(parents):
+                    node["duration"] += duration
+                    node["count"] += 1
+            if self.trace_path and start is not None:
+                event = {
+                    "name": path[-1],
+                    "ph": "X",
+                    "ts": start * 1e6,
+                    "dur": duration * 1e6,
+                    "pid": os.getpid(),
+                    "tid": threading.current_thread().ident,
+                    "args": {"path": "/".join(path)},
+                }
+                self.events.append(event)
+
+    @contextmanager
+    def span(self, name):
+        stack = self.get_stack()
+        stack.append(name)
+        start = time.time()
+        try:
+            yield
+        finally:
+            stack.pop()
+            self.add([name], time.time() - start, start)
+
+    def to_dict(self):
+        """span name => {duration(ms), count, children}"""
+
+        def convert(tree):
+            return {
+                name: {
+                    "duration": node["duration"] * 1000,
+                    "count": node["count"],
+                    "children": convert(node["children"]),
+                }
+                for name, node in tree.items()
+            }
+
+        with self.lock:
+            return convert(self.tree)
+
+    def dump(self, path=""):
+        path = path or self.trace_path
+        if not path:
+            return
+        with self.lock:
+            events = list(self.events)
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+
+PROFILER = Profiler()
+
+
+class IRCache(object):
+    """
+    persistent cache for the parsed ui data
+    the key is the ui content hash, the data of each parser store its version
+    """
+
+    def __init__(self, folder):
+        self.folder = folder
+        self.stats = dict.fromkeys(["hit", "miss", "write", "error", "invalidate"], 0)
+        self.lock = threading.Lock()
+
+    def count(self, key):
+        with self.lock:
+            self.stats[key] += 1
+
+    @staticmethod
+    def get_prefix(ui_path):
+        ui_path = os.path.normcase(os.path.abspath(ui_path))
+        return hashlib.sha1(ui_path.encode("utf-8")).hexdigest()[:16]
+
+    def get_key(self, ui_path, content):
+        sha1 = hashlib.sha1(content)
+        sha1.update(("IR=%s" % IR_VERSION).encode("utf-8"))
+        return "%s-%s" % (self.get_prefix(ui_path), sha1.hexdigest())
+
+    def load(self, key, parsers):
+        """load
+
+        :param key: cache key
+        :type key: str
+        :param parsers: parser class list
+        :type parsers: list
+        :return: cached data and the parsers outdated or missing in the data
+        :rtype: tuple
+        """
+        path = os.path.join(self.folder, "%s.json" % key)
+        try:
+            with open(path, "r") as f:
+                data = byteify(json.load(f))
+        except (IOError, OSError, ValueError):
+            self.count("miss")
+            return None, parsers
+
+        widgets = data.get("widgets", {})
+        missing = []
+        for parser in parsers:
+            tree = widgets.get(parser.TYPE if parser.TYPE else parser.__name__, {})
+            if tree.get("version") != parser.VERSION:
+                missing.append(parser)
+        self.count("miss" if missing else "hit")
+        return data, missing
+
+    def dump(self, key, data):
+        if not os.path.isdir(self.folder):
+            try:
+                os.makedirs(self.folder)
+            except OSError:
+                # NOTE created by the other thread
+                pass
+        try:
+            # NOTE remove the outdated data of the same ui file
+            prefix = key.split("-")[0]
+            for path in glob.iglob(os.path.join(self.folder, "%s-*.json" % prefix)):
+                os.remove(path)
+            content = json.dumps(data).encode("utf-8")
+            replace_file(os.path.join(self.folder, "%s.json" % key), content)
+        except (IOError, OSError):
+            self.count("error")
+            return
+        self.count("write")
+
+    def invalidate(self, ui_path="all"):
+        prefix = "*" if ui_path == "all" else self.get_prefix(ui_path)
+        for path in glob.glob(os.path.join(self.folder, "%s-*.json" % prefix)):
+            try:
+                os.remove(path)
+            except OSError:
+                self.count("error")
+                continue
+            self.count("invalidate")
+
+
+class Artifact(object):
+    """
+    compiled ui data deployed next to the ui file by `python -m UIBot compile`
+    header | zlib json data | marshal code of the Module_PTE
+    """
+
+    SUFFIX = ".uibot"
+    MAGIC = b"UIBT"
+    # NOTE bump when the artifact layout changed
+    VERSION = 1
+    # NOTE magic, version, ir version, python magic, source size, sha1, data size
+    HEADER = struct.Struct("<4sHH4sQ20sI")
+
+    @classmethod
+    def get_path(cls, ui_path):
+        return os.path.splitext(ui_path)[0] + cls.SUFFIX
+
+    @classmethod
+    def dump(cls, ui_path, content, data):
+        """dump
+
+        :param ui_path: ui file path
+        :type ui_path: str
+        :param content: ui file content
+        :type content: bytes
+        :param data: parser-neutral data of all the parsers
+        :type data: dict
+        :raises SyntaxError: the Module_PTE code is invalid
+        :return: artifact path
+        :rtype: str
+        """
+        code = b""
+        if data.get("module") is not None:
+            filename = ModuleCache.get_filename(ui_path)
+            code = marshal.dumps(compile(data["module"], filename, "exec"))
+        text = zlib.compress(json.dumps(data).encode("utf-8"))
+        sha1 = hashlib.sha1(content).digest()
+        info = (cls.VERSION, IR_VERSION, imp.get_magic(), len(content), sha1)
+        header = cls.HEADER.pack(cls.MAGIC, *info + (len(text),))
+
+        path = os.path.abspath(cls.get_path(ui_path))
+        # NOTE the artifact is deployed with the ui file, readable for all
+        replace_file(path, header + text + code, 0o644)
+        return path
+
+    @classmethod
+    def load(cls, ui_path, parsers, content=None):
+        """load
+        the artifact is stale if the ui content or the parser version changed
+
+        :param ui_path: ui file path
+        :type ui_path: str
+        :param parsers: parser class list
+        :type parsers: list
+        :param content: ui file content already read, defaults to None
+        :type content: bytes, optional
+        :return: data with the compiled "code", None if missing or stale
+        :rtype: dict
+        """
+        path = cls.get_path(ui_path)
+        try:
+            with open(path, "rb") as f:
+                buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                if content is None:
+                    with open(ui_path, "rb") as f:
+                        content = f.read()
+                return cls.read(buf, content, parsers)
+            finally:
+                buf.close()
+        except (IOError, OSError, ValueError, EOFError, struct.error, zlib.error):
+            return None
+
+    @classmethod
+    def read(cls, buf, content, parsers):
+        header = cls.HEADER.unpack_from(buf)
+        magic, version, ir_version, py_magic, size, sha1, length = header
+        if (magic, version, ir_version) != (cls.MAGIC, cls.VERSION, IR_VERSION):
+            return None
+        # NOTE the copy or the mirror sync keep no mtime order, always hash
+        if size != len(content) or hashlib.sha1(content).digest() != sha1:
+            return None
+
+        start = cls.HEADER.size
+        end = start + length
+        data = byteify(json.loads(zlib.decompress(buf[start:end]).decode("utf-8")))
+        widgets = data.get("widgets", {})
+        for parser in parsers:
+            tree = widgets.get(parser.TYPE if parser.TYPE else parser.__name__, {})
+            if tree.get("version") != parser.VERSION:
+                return None
+
+        # NOTE the code compiled by the other python fallback to the source
+        if py_magic == imp.get_magic() and len(buf) > end:
+            data["code"] = marshal.loads(buf[end:])
+        return data
+
+
+def replace_file(path, content, mode=None):
+    """write the file atomically, the reader never see a partial file"""
+    folder = os.path.dirname(path)
+    handle, temp = tempfile.mkstemp(dir=folder, suffix=".tmp")
+    try:
+        with os.fdopen(handle, "wb") as f:
+            f.write(content)
+        if mode is not None:
+            os.chmod(temp, mode)
+        if hasattr(os, "replace"):
+            os.replace(temp, path)
+            return
+        if os.path.exists(path):
+            # NOTE python 2 on windows cannot rename to the existing file
+            os.remove(path)
+        os.rename(temp, path)
+    except Exception:
+        # NOTE never leave the temp file behind
+        if os.path.exists(temp):
+            os.remove(temp)
+        raise
+
+
+class Mirror(object):
+    """
+    local copy of the network config folders, synced in a thread
+    validated by size, mtime and content hash, the least recently used
+    folders are evicted when the total size exceed the limit
+    """
+
+    SUFFIXES = (".ui", ".uibot", ".py", ".png", ".svg", ".xpm", ".bmp", ".jpg")
+
+    def __init__(self, folder, limit):
+        self.folder = folder
+        self.limit = limit
+        self.lock = threading.Lock()
+        self.thread = None
+        self.manifest_path = os.path.join(folder, "manifest.json")
+        # NOTE key => source folder, last used time, size, name => [mtime, size, sha1]
+        self.manifest = None
+        self.stats = dict.fromkeys(["copy", "skip", "remove", "evict", "error"], 0)
+
+    @staticmethod
+    def get_key(source):
+        source = os.path.normcase(os.path.abspath(source))
+        return hashlib.sha1(source.encode("utf-8")).hexdigest()[:16]
+
+    def load(self):
+        if self.manifest is not None:
+            return self.manifest
+        try:
+            with open(self.manifest_path, "r") as f:
+                self.manifest = byteify(json.load(f))
+        except (IOError, OSError, ValueError):
+            self.manifest = {}
+        return self.manifest
+
+    def save(self):
+        with self.lock:
+            text = json.dumps(self.manifest)
+        try:
+            replace_file(self.manifest_path, text.encode("utf-8"))
+        except (IOError, OSError):
+            self.stats["error"] += 1
+
+    def get_path(self, source):
+        """the local folder if synced, otherwise the source folder"""
+        key = self.get_key(source)
+        with self.lock:
+            entry = self.load().get(key)
+            if entry is None:
+                return source
+            entry["used"] = time.time()
+        return os.path.join(self.folder, key)
+
+    def contains(self, path):
+        folder = os.path.normcase(os.path.abspath(self.folder))
+        return os.path.normcase(os.path.abspath(path)).startswith(folder + os.sep)
+
+    def sync_folder(self, source):
+        """sync_folder
+
+        :param source: network config folder
+        :type source: str
+        :return: changed local file paths
+        :rtype: list
+        """
+        key = self.get_key(source)
+        local = os.path.join(self.folder, key)
+        try:
+            names = os.listdir(source)
+        except OSError:
+            # NOTE the server is unavailable, keep using the local copy
+            self.stats["error"] += 1
+            return []
+        names = [name for name in names if name.endswith(self.SUFFIXES)]
+        if not os.path.isdir(local):
+            os.makedirs(local)
+
+        with self.lock:
+            entry = dict(self.load().get(key) or {"files": {}})
+        files = dict(entry["files"])
+        changed = []
+        for name in names:
+            path = os.path.join(source, name)
+            local_path = os.path.join(local, name)
+            old = files.get(name)
+            try:
+                stat = os.stat(path)
+                info = [stat.st_mtime, stat.st_size]
+                if old and old[:2] == info and os.path.isfile(local_path):
+                    self.stats["skip"] += 1
+                    continue
+                with open(path, "rb") as f:
+                    content = f.read()
+                sha1 = hashlib.sha1(content).hexdigest()
+                # NOTE only touched on the server, the content is the same
+                if not (old and old[2] == sha1 and os.path.isfile(local_path)):
+                    replace_file(local_path, content)
+                    changed.append(local_path)
+                    self.stats["copy"] += 1
+            except (IOError, OSError):
+                self.stats["error"] += 1
+                continue
+            files[name] = info + [sha1]
+
+        for name in set(files) - set(names):
+            local_path = os.path.join(local, name)
+            if os.path.isfile(local_path):
+                os.remove(local_path)
+            del files[name]
+            changed.append(local_path)
+            self.stats["remove"] += 1
+
+        entry["source"] = source
+        entry["files"] = files
+        entry["size"] = sum(info[1] for info in files.values())
+        entry["used"] = time.time()
+        with self.lock:
+            self.manifest[key] = entry
+        return changed
+
+    def evict(self, sources=None):
+        """remove the least recently used folders until the size fit the limit
+
+        :param sources: network config folders in use, never evicted
+        :type sources: list, optional
+        """
+        keep = set(self.get_key(source) for source in sources or [])
+        with self.lock:
+            entries = sorted(self.load().items(), key=lambda item: item[1]["used"])
+            total = sum(entry["size"] for _, entry in entries)
+            for key, entry in entries:
+                if total <= self.limit:
+                    break
+                if key in keep:
+                    # NOTE the main thread may read the folder
+                    continue
+                total -= entry["size"]
+                del self.manifest[key]
+                shutil.rmtree(os.path.join(self.folder, key), ignore_errors=True)
+                self.stats["evict"] += 1
+
+    def sync(self, sources):
+        """sync
+
+        :param sources: network config folders
+        :type sources: list
+        :return: changed local file paths
+        :rtype: list
+        """
+        changed = []
+        for source in sources:
+            changed.extend(self.sync_folder(source))
+        self.evict(sources)
+        self.save()
+        return changed
+
+    def is_running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(self, sources, callback=None):
+        """sync in a thread, call back on the main thread with the changed files"""
+        if self.is_running():
+            return
+        self.thread = threading.Thread(target=self.run, args=(sources, callback))
+        self.thread.daemon = True
+        self.thread.start()
+
+    def run(self, sources, callback):
+        try:
+            changed = self.sync(sources)
+        except Exception:
+            traceback.print_exc()
+            return
+        if changed and callback:
+            utils.executeDeferred(callback, changed)
+
+
+class FolderCache(object):
+    """
+    single scandir pass snapshot of the config folders
+    revalidated by the folder mtime, only the add/remove/rename change it
+    """
+
+    SUFFIXES = (".ui", ".py")
+
+    def __init__(self):
+        # NOTE folder => (folder mtime, {file path: (mtime, size)})
+        self.folders = {}
+        self.stats = {"scan": 0, "hit": 0}
+
+    def scan(self, folder, check=True):
+        """scan
+
+        :param folder: config folder
+        :type folder: str
+        :param check: revalidate the folder mtime, defaults to True
+        :type check: bool, optional
+        :return: file path => (mtime, size) of the relevant files
+        :rtype: dict
+        """
+        cache = self.folders.get(folder)
+        if cache and not check:
+            self.stats["hit"] += 1
+            return cache[1]
+        try:
+            mtime = os.stat(folder).st_mtime
+        except OSError:
+            self.folders.pop(folder, None)
+            return {}
+        if cache and cache[0] == mtime:
+            self.stats["hit"] += 1
+            return cache[1]
+
+        files = {}
+        self.stats["scan"] += 1
+        with PROFILER.span("scan"), PROFILER.span(folder):
+            for path, stat in self.iter_files(folder):
+                files[path] = (stat.st_mtime, stat.st_size)
+        self.folders[folder] = (mtime, files)
+        return files
+
+    def iter_files(self, folder):
+        match = lambda name: os.path.normcase(name).endswith(self.SUFFIXES)
+        if scandir is None:
+            for name in filter(match, os.listdir(folder)):
+                path = os.path.join(folder, name)
+                stat = os.stat(path)
+                if S_ISREG(stat.st_mode):
+                    yield path, stat
+            return
+
+        for entry in scandir(folder):
+            # NOTE the entry stat come from the listing on windows
+            if match(entry.name) and entry.is_file():
+                yield entry.path, entry.stat()
+
+    def files(self, folders, suffix, check=True):
+        """files
+
+        :param folders: config folders
+        :type folders: list
+        :param suffix: file name suffix like `.ui` or `_parser.py`
+        :type suffix: str
+        :param check: revalidate the folder mtime, defaults to True
+        :type check: bool, optional
+        :return: sorted file path list of each folder
+        :rtype: list
+        """
+        paths = []
+        for folder in folders:
+            files = self.scan(folder, check)
+            match = lambda p: os.path.normcase(p).endswith(suffix)
+            paths.extend(sorted(path for path in files if match(path)))
+        return paths
+
+    def invalidate(self):
+        self.folders = {}
+
+
+class IconIndex(object):
+    """
+    icon basename => absolute path across the icon folders
+    revalidated by the folder mtime, the missing icons are reported once
+    """
+
+    def __init__(self):
+        # NOTE folder => (folder mtime, file names)
+        self.folders = {}
+        self.order = []
+        self.icons = {}
+        self.missing = set()
+        self.stats = {"scan": 0, "hit": 0, "resource": 0}
+
+    @staticmethod
+    def get_folders(paths):
+        """get_folders
+
+        :param paths: config folders, the icons may be placed beside the ui files
+        :type paths: list
+        :return: XBMLANGPATH folders, the module icons folder and the paths
+        :rtype: list
+        """
+        folders = []
+        for folder in os.getenv("XBMLANGPATH", "").split(os.pathsep):
+            # NOTE the linux entries end with the `%B` placeholder
+            if folder.endswith("%B"):
+                folder = folder[:-2]
+            folders.append(folder)
+        folders.append(os.path.join(ROOT, "icons"))
+        folders.extend(paths)
+        norm = lambda folder: os.path.normcase(os.path.normpath(folder))
+        return list(OrderedDict((norm(f), f) for f in folders if f).values())
+
+    def update(self, folders):
+        """update
+        list again only the folders changed on disk
+
+        :param folders: icon folders in the lookup order
+        :type folders: list
+        """
+        changed = folders != self.order
+        for folder in folders:
+            cache = self.folders.get(folder)
+            try:
+                mtime = os.stat(folder).st_mtime
+            except OSError:
+                changed = changed or cache is not None
+                self.folders.pop(folder, None)
+                continue
+            if cache and cache[0] == mtime:
+                self.stats["hit"] += 1
+                continue
+            self.stats["scan"] += 1
+            with PROFILER.span("icon scan"):
+                try:
+                    names = os.listdir(folder)
+                except OSError:
+                    names = []
+            self.folders[folder] = (mtime, names)
+            changed = True
+        if not changed:
+            return
+
+        icons = {}
+        # NOTE the first folder win like the maya search
+        for folder in reversed(folders):
+            _, names = self.folders.get(folder, (None, []))
+            for name in names:
+                icons[name] = os.path.join(folder, name)
+        self.order = list(folders)
+        self.icons = icons
+
+    def resolve(self, name):
+        """resolve
+
+        :param name: icon basename
+        :type name: str
+        :return: absolute path, the qt resource path or the name if missing
+        :rtype: str
+        """
+        if not name or os.path.isabs(name) or name.startswith(":"):
+            return name
+        path = self.icons.get(name)
+        if path is not None:
+            return path
+        if name in self.missing:
+            return name
+        # NOTE the maya builtin icons only exist in the qt resource
+        self.stats["resource"] += 1
+        if cmds.resourceManager(nameFilter=name):
+            path = ":/%s" % name
+            self.icons[name] = path
+            return path
+        self.missing.add(name)
+        OpenMaya.MGlobal.displayWarning("UIBot icon not found: %s" % name)
+        return name
+
+
+ICONS = IconIndex()
+
+
+class ModuleCache(object):
+    """
+    config python module cache keyed by path, mtime and size
+    only the changed file is executed again
+    """
+
+    def __init__(self):
+        self.modules = {}
+        # NOTE ui path => (source hash, Module_PTE module)
+        self.embedded = {}
+        # NOTE source hash => compiled code
+        self.codes = {}
+
+    def load(self, path, name):
+        stat = os.stat(path)
+        key = (stat.st_mtime, stat.st_size)
+        cache = self.modules.get(path)
+        if cache and cache[0] == key:
+            return cache[1]
+        prefetched = PREFETCHER.pop(path, stat)
+        with PROFILER.span("module load"), PROFILER.span(os.path.basename(path)):
+            if prefetched:
+                # NOTE same as load_source with the code compiled in userSetup
+                module = imp.new_module(name)
+                module.__file__ = path
+                sys.modules[name] = module
+                six.exec_(prefetched[1], module.__dict__)
+            else:
+                module = imp.load_source(name, path)
+        if cache:
+            # NOTE load_source execute again into the same module object
+            Callback.invalidate(module)
+        self.modules[path] = (key, module)
+        return module
+
+    def load_embedded(self, ui_path, source, code=None):
+        """load_embedded
+        the Module_PTE code of each ui file run in its own module,
+        only executed again when the source changed
+
+        :param ui_path: ui file path
+        :type ui_path: str
+        :param source: Module_PTE source code
+        :type source: str
+        :param code: code compiled by the artifact, defaults to None
+        :type code: code, optional
+        :return: module of the ui file
+        :rtype: module
+        """
+        key = hashlib.sha1(six.ensure_binary(source)).hexdigest()
+        cache = self.embedded.get(ui_path)
+        if cache and cache[0] == key:
+            return cache[1]
+        # NOTE the broken code leave the `@:` callbacks of the file unresolved
+        self.embedded.pop(ui_path, None)
+        code = code or self.codes.get(key)
+        if code is None:
+            code = compile(source, self.get_filename(ui_path), "exec")
+        self.codes[key] = code
+        module = imp.new_module("__UIBot_Internal_Module__")
+        module.__file__ = ui_path
+        six.exec_(code, module.__dict__)
+        self.embedded[ui_path] = (key, module)
+        return module
+
+    @staticmethod
+    def get_filename(ui_path):
+        """traceback filename of the Module_PTE code, not the line of the xml"""
+        return "<%s Module_PTE>" % ui_path
+
+
+class ModuleDict(object):
+    """
+    name<=>module mapping, the module is loaded on the first access
+    """
+
+    def __init__(self, cache, paths=None, modules=None, ui_path=None):
+        self.cache = cache
+        self.paths = dict(paths or {})
+        self.modules = dict(modules or {})
+        # NOTE `@:func` resolve in the Module_PTE module of the ui file
+        self.ui_path = ui_path
+
+    def __setitem__(self, name, module):
+        self.modules[name] = module
+
+    def __contains__(self, name):
+        return name in self.modules or name in self.paths
+
+    def get(self, name, default=None):
+        if name in self.modules:
+            return self.modules[name]
+        if name == "" and self.ui_path in self.cache.embedded:
+            # NOTE the kept ui pick up the module of the changed source
+            return self.cache.embedded[self.ui_path][1]
+        path = self.paths.get(name)
+        if path is None:
+            return default
+        # NOTE the cache reload the edited file, the callbacks pick up the change
+        return self.cache.load(path, "__UIBot_%s__" % name)
+
+    def copy(self):
+        return ModuleDict(self.cache, self.paths, self.modules, self.ui_path)
+
+
+class Callback(object):
+    """
+    `@module:attr.path` callback resolve on the first call
+    """
+
+    # NOTE (module, attr path) => resolved callable
+    CACHE = {}
+
+    def __init__(self, py_dict, module_name, attr_path, script=""):
+        self.py_dict = py_dict
+        self.module_name = module_name
+        self.attr_path = attr_path
+        self.script = script
+
+    @property
+    def ident(self):
+        """same callback of the registration again, `@:func` differ by ui file"""
+        ui_path = None if self.module_name else self.py_dict.ui_path
+        return (ui_path, self.module_name, self.attr_path)
+
+    def resolve(self):
+        module = self.py_dict.get(self.module_name)
+        key = (module, self.attr_path)
+        if key in self.CACHE:
+            return self.CACHE[key]
+
+        with PROFILER.span("callback resolve"), PROFILER.span(self.script):
+            callback = module
+            for attr in self.attr_path.split("."):
+                callback = getattr(callback, attr, None)
+        callback = callback if callable(callback) else None
+        if module is not None:
+            self.CACHE[key] = callback
+        return callback
+
+    @classmethod
+    def invalidate(cls, module):
+        """drop the resolved callbacks of the module executed again"""
+        for key in [key for key in cls.CACHE if key[0] is module]:
+            del cls.CACHE[key]
+
+    def __call__(self, *args, **kwargs):
+        callback = self.resolve()
+        if callback is None:
+            print("cannot evaluate `%s`" % self.script)
+            return
+        return callback(*args, **kwargs)
+
+
+class DocumentIndex(object):
+    """
+    single pass index of the ui document shared by all the parsers
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.names = {}
+        self.classes = defaultdict(list)
+        self.tags = defaultdict(list)
+        for element in root.iter():
+            tag = element.tag
+            self.tags[tag].append(element)
+            if tag != "widget" and tag != "action":
+                continue
+            name = element.attrib.get("name")
+            if name and name not in self.names:
+                self.names[name] = element
+            cls = element.attrib.get("class")
+            if cls:
+                self.classes[cls].append(element)
+
+    def find(self, name, cls=None):
+        """find the widget or action by object name (and class)"""
+        element = self.names.get(name)
+        if element is None or cls and element.attrib.get("class") != cls:
+            return None
+        return element
+
+    def findall(self, cls):
+        """find all the widgets by class name"""
+        return self.classes.get(cls, [])
+
+
+class SubtreeBuilder(object):
+    """
+    streaming parser target keep the matched subtrees only,
+    the other elements are never built
+    """
+
+    def __init__(self, subtrees):
+        self.patterns = defaultdict(list)
+        for tag, name, cls in subtrees:
+            self.patterns[tag].append((name, cls))
+        self.root = ET.Element("ui")
+        self.builder = None
+        # NOTE depth inside the kept subtree, the nested match is kept with it
+        self.keep = 0
+
+    def match(self, tag, attrib):
+        for name, cls in self.patterns.get(tag, []):
+            if name is not None and attrib.get("name") != name:
+                continue
+            if cls is not None and attrib.get("class") != cls:
+                continue
+            return True
+        return False
+
+    def start(self, tag, attrib):
+        if self.keep:
+            self.keep += 1
+        elif self.match(tag, attrib):
+            self.keep = 1
+            self.builder = ET.TreeBuilder()
+        else:
+            return
+        self.builder.start(tag, attrib)
+
+    def end(self, tag):
+        if not self.keep:
+            return
+        self.keep -= 1
+        element = self.builder.end(tag)
+        if not self.keep:
+            self.root.append(element)
+
+    def data(self, data):
+        if self.keep:
+            self.builder.data(data)
+
+    def close(self):
+        return self.root
+
+    @classmethod
+    def parse(cls, content, subtrees):
+        """parse
+
+        :param content: ui file content
+        :type content: bytes
+        :param subtrees: (tag, name, class) of the subtree roots, None match any
+        :type subtrees: list
+        :return: root element holding the matched subtrees
+        :rtype: Element
+        """
+        parser = ET.XMLParser(target=cls(subtrees))
+        parser.feed(content)
+        return parser.close()
+
+
+class Watcher(object):
+    """
+    poll the config files in a thread, reload the changed files on the main thread
+    """
+
+    def __init__(self, callback, interval=1.0, delay=0.5, limit=100):
+        """__init__
+
+        :param callback: call with the changed path list on the main thread
+        :type callback: callable
+        :param interval: seconds between the polls, defaults to 1.0
+        :type interval: float, optional
+        :param delay: seconds without change before the reload, defaults to 0.5
+        :type delay: float, optional
+        :param limit: max file stat of each poll, defaults to 100
+        :type limit: int, optional
+        """
+        self.callback = callback
+        self.interval = interval
+        self.delay = delay
+        self.limit = limit
+        self.paths = []
+        self.folders = FolderCache()
+        self.files = {}
+        self.cursor = 0
+        self.pending = set()
+        self.last = 0.0
+        self.event = threading.Event()
+        self.thread = None
+
+    def is_relevant(self, path):
+        name = os.path.normcase(path)
+        return name.endswith(".ui") or name.endswith("%s.py" % PARSER_SUFFIX)
+
+    def snapshot(self):
+        files = {}
+        for folder in self.paths:
+            for path, key in self.folders.scan(folder).items():
+                if self.is_relevant(path):
+                    files[path] = self.files.get(path, key)
+        return files
+
+    def poll(self):
+        """poll
+
+        :return: added, removed and modified path set
+        :rtype: set
+        """
+        files = self.snapshot()
+        changed = set(files) ^ set(self.files)
+        # NOTE stat a bounded slice of the files on each poll
+        paths = sorted(files)
+        count = min(self.limit, len(paths))
+        for index in range(count):
+            path = paths[(self.cursor + index) % len(paths)]
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            key = (stat.st_mtime, stat.st_size)
+            if files[path] != key:
+                files[path] = key
+                changed.add(path)
+        self.cursor = (self.cursor + count) % len(paths) if paths else 0
+        self.files = files
+        return changed
+
+    def run(self):
+        while not self.event.wait(self.interval):
+            try:
+                changed = self.poll()
+            except Exception:
+                traceback.print_exc()
+                continue
+            now = time.time()
+            if changed:
+                self.pending.update(changed)
+                self.last = now
+            elif self.pending and now - self.last >= self.delay:
+                # NOTE debounce the save bursts, reload after the files settled
+                pending, self.pending = self.pending, set()
+                utils.executeDeferred(self.callback, sorted(pending))
+
+    def start(self, paths, interval=None):
+        self.stop()
+        self.paths = list(paths)
+        self.interval = interval if interval else self.interval
+        self.folders.invalidate()
+        self.files = {}
+        self.files = self.snapshot()
+        self.event = threading.Event()
+        self.thread = threading.Thread(target=self.run, name="UIBotWatcher")
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        thread, self.thread = self.thread, None
+        self.event.set()
+        if thread is not None:
+            thread.join(self.interval)
+        self.pending = set()
+
+    def is_running(self):
+        return self.thread is not None
+
+
+class Scheduler(object):
+    """
+    run the operations in time slices on the maya idle event
+    """
+
+    def __init__(self, backend="python"):
+        # NOTE "mel" compile the operations into a single mel.eval on flush
+        self.backend = backend
+        self.budget = 0.0
+        self.queue = deque()
+        self.callbacks = []
+        self.stats = None
+        self.job = None
+        self.total = 0
+        self.done = 0
+
+    def submit(self, operations, stats=None, callback=None, budget=0.0):
+        """submit
+
+        :param operations: operation list
+        :type operations: list
+        :param stats: operation counter, defaults to None
+        :type stats: dict, optional
+        :param callback: call after all the operations done, defaults to None
+        :type callback: callable, optional
+        :param budget: seconds for each idle slice, 0 run at once
+        :type budget: float, optional
+        """
+        self.flush()
+        self.budget = budget
+        self.stats = stats
+        self.total = len(operations)
+        self.done = 0
+        # NOTE delete the outdated ui, then create the top level ui first
+        key = lambda op: (op.action != Operation.DELETE, op.depth or 0)
+        self.queue.extend(sorted(operations, key=key) if budget > 0 else operations)
+        if callback:
+            self.callbacks.append(callback)
+        if budget > 0 and self.queue:
+            self.job = cmds.scriptJob(idleEvent=self.run)
+        else:
+            self.flush()
+
+    def cancel(self, states):
+        """drop the pending create and edit operations of the states
+
+        :param states: registered states to deregister, the children included
+        :type states: list
+        """
+        ids = set(id(state) for state in states)
+        is_keep = lambda op: op.action == Operation.DELETE or id(op.state) not in ids
+        queue = deque(op for op in self.queue if is_keep(op))
+        self.total -= len(self.queue) - len(queue)
+        self.queue = queue
+        if all(op.action == Operation.DELETE for op in queue):
+            # NOTE only the cheap deletes left, run them and kill the idle job
+            self.flush()
+
+    def count(self, operation):
+        self.done += 1
+        if self.stats is not None:
+            action = operation.action
+            self.stats[action] = self.stats.get(action, 0) + 1
+
+    def delete(self):
+        """delete the consecutive pending delete operations in one batch"""
+        ui_dict = defaultdict(list)
+        start = time.time()
+        while self.queue and self.queue[0].action == Operation.DELETE:
+            operation = self.queue.popleft()
+            state = operation.state
+            kind = state.get("kind", operation.parser.KIND)
+            ui_dict[kind].extend(state.get("ui", []))
+            self.count(operation)
+        try:
+            delete_ui(ui_dict)
+        except RuntimeError:
+            traceback.print_exc()
+        PROFILER.add(["widget delete"], time.time() - start, start)
+
+    def step(self):
+        if self.queue[0].action == Operation.DELETE:
+            self.delete()
+            return
+        operation = self.queue.popleft()
+        start = time.time()
+        try:
+            operation()
+        except Exception:
+            # NOTE the failed ui is left without ui names, created again next time
+            traceback.print_exc()
+        parser = operation.parser
+        key = parser.TYPE if parser.TYPE else parser.__class__.__name__
+        top = operation.top or operation.state.get("object_name", "")
+        PROFILER.add(["widget create", key, top], time.time() - start, start)
+        self.count(operation)
+
+    def batch(self):
+        """compile the pending create operations into mel scripts"""
+        batch = MelBatch()
+        while self.queue:
+            if batch.add(self.queue[0]):
+                self.count(self.queue.popleft())
+                continue
+            # NOTE keep the order, the operation may depend on the batched ui
+            batch.flush()
+            self.step()
+        batch.flush()
+
+    def run(self):
+        start = time.time()
+        while self.queue and time.time() - start < self.budget:
+            self.step()
+        if not self.queue:
+            self.finish()
+
+    def flush(self):
+        """run the pending operations at once"""
+        if self.backend == "mel":
+            self.batch()
+        while self.queue:
+            self.step()
+        self.finish()
+
+    def finish(self):
+        job, self.job = self.job, None
+        if job is not None:
+            # NOTE kill the idle job outside its own callback
+            cmds.evalDeferred(partial(cmds.scriptJob, kill=job, force=1))
+        callbacks, self.callbacks = self.callbacks, []
+        for callback in callbacks:
+            callback()
+
+    def progress(self):
+        return {
+            "total": self.total,
+            "done": self.done,
+            "pending": len(self.queue),
+            "running": self.job is not None,
+        }
+
+
+def delete_ui(ui_dict):
+    """delete_ui
+    delete the ui in a single deleteUI call of each kind
+
+    :param ui_dict: deleteUI flag => ui name list
+    :type ui_dict: dict
+    :return: ui count to delete
+    :rtype: int
+    """
+    count = 0
+    for kind, ui_list in ui_dict.items():
+        ui_list = [ui for ui in OrderedDict.fromkeys(ui_list) if ui]
+        if not ui_list:
+            continue
+        count += len(ui_list)
+        try:
+            cmds.deleteUI(ui_list, **{kind: True})
+        except RuntimeError:
+            # NOTE some ui already gone, delete the rest only
+            exists = getattr(cmds, kind)
+            ui_list = [ui for ui in ui_list if exists(ui, ex=1)]
+            if ui_list:
+                cmds.deleteUI(ui_list, **{kind: True})
+    return count
+
+
+class Command(object):
+    """maya ui command, the flag value can be the result of another command"""
+
+    def __init__(self, name, args=None, flags=None, scripts=None):
+        self.name = name
+        self.args = list(args or [])
+        self.flags = flags or {}
+        # NOTE the string value of these flags is python script
+        self.scripts = scripts or []
+        self.result = None
+        # NOTE result index in the mel batch
+        self.index = None
+
+    def __call__(self):
+        resolve = lambda v: v.result if isinstance(v, Command) else v
+        args = [resolve(arg) for arg in self.args]
+        flags = {flag: resolve(value) for flag, value in self.flags.items()}
+        self.result = getattr(cmds, self.name)(*args, **flags)
+        return self.result
+
+
+class CallbackRegistry(object):
+    """
+    key<=>python callback for the mel script to call back into python
+    """
+
+    # NOTE placeholder maya replace with the control value, e.g. the check state
+    ARG = "#1"
+
+    def __init__(self):
+        self.callbacks = {}
+        # NOTE script or callback ident => key, the shared callback register once
+        self.keys = {}
+
+    @staticmethod
+    def get_ident(callback):
+        if isinstance(callback, six.string_types):
+            return callback
+        return getattr(callback, "ident", None) or id(callback)
+
+    def add(self, callback):
+        ident = self.get_ident(callback)
+        key = self.keys.get(ident)
+        if key is None:
+            key = len(self.callbacks)
+            self.keys[ident] = key
+        # NOTE the registration again reuse the key, the registry never grow
+        self.callbacks[key] = callback
+        return key
+
+    @staticmethod
+    def decode_arg(arg):
+        if arg in ("true", "false"):
+            return arg == "true"
+        for convert in (int, float):
+            try:
+                return convert(arg)
+            except ValueError:
+                pass
+        return arg
+
+    def call(self, key, *args):
+        callback = self.callbacks[key]
+        if isinstance(callback, six.string_types):
+            # NOTE same as the string command from python
+            six.exec_(callback, __main__.__dict__)
+            return
+        # NOTE the placeholder is kept when the control has no value to pass
+        args = [self.decode_arg(arg) for arg in args if arg != self.ARG]
+        return callback(*args)
+
+
+CALLBACKS = CallbackRegistry()
+
+
+MEL_ESCAPE = [
+    ("\\", "\\\\"),
+    ('"', '\\"'),
+    ("\n", "\\n"),
+    ("\r", "\\r"),
+    ("\t", "\\t"),
+]
+
+
+def mel_string(text):
+    text = text if isinstance(text, six.string_types) else str(text)
+    for char, escape in MEL_ESCAPE:
+        text = text.replace(char, escape)
+    return '"%s"' % text
+
+
+class MelBatch(object):
+    """
+    compile the create operations into a single mel proc call
+    """
+
+    PROC = "UIBot_batch"
+
+    def __init__(self):
+        self.commands = []
+        self.pending = []
+        # NOTE state id => pending commands, resolve the parent in the batch
+        self.states = {}
+
+    def resolve(self, state, index):
+        if not state:
+            return None
+        commands = self.states.get(id(state))
+        if commands is not None:
+            return commands[index]
+        ui_list = state.get("ui")
+        return ui_list[index] if ui_list else None
+
+    def add(self, operation):
+        """add
+
+        :param operation: operation to compile
+        :type operation: Operation
+        :return: False if the operation cannot be batched
+        :rtype: bool
+        """
+        if operation.action != Operation.CREATE:
+            return False
+        state = operation.state
+        parent = self.resolve(operation.parent, 0)
+        if operation.parent and parent is None:
+            # NOTE the parent failed to create, the operation skip it
+            return False
+        after = self.resolve(operation.after, -1) or ""
+        commands = operation.parser.emit_item(state, parent, after)
+        if commands is None:
+            return False
+        for command in commands:
+            command.index = len(self.commands)
+            self.commands.append(command)
+        self.states[id(state)] = commands
+        self.pending.append((state, commands))
+        return True
+
+    def format_value(self, flag, value, command):
+        if isinstance(value, Command):
+            return "$ui[%s]" % value.index
+        if isinstance(value, bool):
+            return "1" if value else "0"
+        if isinstance(value, (int, float)):
+            return repr(value)
+        if isinstance(value, (list, tuple)):
+            return " ".join(self.format_value(flag, v, command) for v in value)
+        is_script = flag in command.scripts and isinstance(value, six.string_types)
+        if callable(value) or is_script:
+            key = CALLBACKS.add(value)
+            script = "import {0}; {0}.CALLBACKS.call({1}, '{2}')"
+            script = script.format(PLUGIN_NAME, key, CALLBACKS.ARG)
+            value = "python(%s)" % mel_string(script)
+        return mel_string(value)
+
+    def compile(self):
+        lines = ["global proc string[] %s() {" % self.PROC, "string $ui[];"]
+        for command in self.commands:
+            words = [command.name]
+            for flag, value in command.flags.items():
+                if value is None:
+                    continue
+                words.append("-%s %s" % (flag, self.format_value(flag, value, command)))
+            words.extend(self.format_value("", arg, command) for arg in command.args)
+            # NOTE a failed command leave an empty name instead of abort the proc
+            line = "catch($ui[%s] = `%s`);" % (command.index, " ".join(words))
+            parent = command.flags.get("parent", command.flags.get("p"))
+            if isinstance(parent, Command):
+                line = 'if ($ui[%s] != "") %s' % (parent.index, line)
+            lines.append(line)
+        lines.extend(["return $ui;", "}", "%s();" % self.PROC])
+        return "\n".join(lines)
+
+    def flush(self):
+        """run the compiled script and assign the ui names to the states"""
+        if not self.pending:
+            return
+        pending, self.pending = self.pending, []
+        script = self.compile()
+        self.commands = []
+        self.states = {}
+        start = time.time()
+        try:
+            ui_list = mel.eval(script) or []
+        except RuntimeError:
+            traceback.print_exc()
+            ui_list = []
+        PROFILER.add(["widget create", "mel batch"], time.time() - start, start)
+        for state, commands in pending:
+            for command in commands:
+                index = command.index
+                result = ui_list[index] if index < len(ui_list) else ""
+                command.result = result or None
+            ui = [c.result for c in commands if c.result is not None]
+            if len(ui) != len(commands):
+                # NOTE drop the partial item, the next registration create it again
+                delete_ui({state.get("kind", UIParser.KIND): ui})
+                ui = []
+            state["ui"] = ui
+
+
+class Operation(object):
+    """single maya ui call generated by the reconcile"""
+
+    CREATE = "create"
+    EDIT = "edit"
+    DELETE = "delete"
+
+    def __init__(self, action, parser, state, parent=None, after=None, changes=None):
+        self.action = action
+        self.parser = parser
+        self.state = state
+        self.parent = parent
+        self.after = after
+        self.changes = changes
+        self.depth = None
+        # NOTE object name of the top level item
+        self.top = None
+
+    def __call__(self):
+        state = self.state
+        if self.action != self.DELETE and self.parent and not self.parent.get("ui"):
+            # NOTE the parent failed to create, skip the children as well
+            return
+        parent = self.parent["ui"][0] if self.parent else None
+        if self.action == self.CREATE:
+            after = self.after.get("ui") if self.after else None
+            after = after[-1] if after else ""
+            state["ui"] = list(self.parser.create_item(state, parent, after))
+        elif self.action == self.EDIT:
+            try:
+                self.parser.edit_item(state, self.changes, parent)
+            except Exception:
+                # NOTE the state already hold the new config, recreate it next time
+                state["dirty"] = True
+                raise
+        elif self.action == self.DELETE:
+            self.parser.delete_item(state)
+
+
 class UIParser(six.with_metaclass(abc.ABCMeta, object)):
     TYPE = ""
+    # NOTE bump when the extract data changed, outdate the cache
+    VERSION = 1
     SCRIPT_FLAG = []
+    # NOTE the icon basename flags resolved to the indexed path
+    ICON_FLAG = ["image", "image1", "image2", "image3"]
     MAPPING = {}
-
-    def __init__(self, root, py_dict):
+    # NOTE deleteUI flag of the created ui
+    KIND = "control"
+    # NOTE (tag, name, class) of the ui subtrees to extract, None need the whole ui
+    SUBTREES = None
+    # NOTE qt property tag => decoder of the value element
+    DECODERS = {
+        "bool": lambda element: element.text == "true",
+        "number": lambda element: int(element.text),
+        "double": lambda element: float(element.text),
+        "string": decode_text,
+        "cstring": decode_text,
+        "iconset": decode_text,
+        "enum": decode_text,
+        "set": decode_set,
+        "stringlist": decode_list,
+        "size": decode_size,
+    }
+
+    def __init__(self, root, py_dict, index=None):
         self.root = root
         self.py_dict = py_dict
+        if index is None and root is not None:
+            index = DocumentIndex(root)
+        self.index = index
+        # NOTE share the lazy callback between the items
+        self.callbacks = {}
+        # NOTE config mistakes dropped silently while extracting
+        self.issues = []
 
     def parse_script_flag(self, config, object_name="null"):
         """parse_script_flag [summary]
@@ -136,7 +1707,6 @@ class UIParser(six.with_metaclass(abc.ABCMeta, object)):
         Returns:
             [type]: [description]
         """
-        msg = "`%s` cannot evaluate `%s`:`%s`"
         for flag in self.SCRIPT_FLAG:
             script = config.get(flag, "").strip()
             if script == "":
@@ -144,100 +1714,641 @@ class UIParser(six.with_metaclass(abc.ABCMeta, object)):
 
             if script.startswith("@") and ":" in script:
                 scripts = script[1:].split(":")
-                module_name = scripts[0]
-                func_name = scripts[1]
-
-                call = lambda *a, **kw: print(kw.get("msg", object_name))
-                default_callback = partial(call, msg=msg % (object_name, flag, script))
-                callback = self.py_dict.get(module_name)
-                for attr in func_name.split("."):
-                    callback = getattr(callback, attr, default_callback)
-                config[flag] = callback if callable(callback) else default_callback
+                key = (scripts[0], scripts[1])
+                callback = self.callbacks.get(key)
+                if callback is None:
+                    callback = Callback(self.py_dict, scripts[0], scripts[1], script)
+                    self.callbacks[key] = callback
+                config[flag] = callback
             else:
                 config[flag] = script
         return config
 
+    def parse_icon_flag(self, config):
+        """resolve the icon basenames to skip the maya search of each widget"""
+        for flag in self.ICON_FLAG:
+            icon = config.get(flag)
+            if icon and isinstance(icon, six.string_types):
+                config[flag] = ICONS.resolve(icon)
+        return config
+
     def parse_properties(self, element, mapping=None, prop="property"):
-        CUSTOM = "custom"
-        ATTRS = "attrs"
         mapping = mapping if mapping else self.MAPPING
-        menu_dict = defaultdict(dict)
-        for p in element.findall(prop):
+        attrs = {}
+        custom_attrs = {}
+        for p in element:
+            # NOTE direct children access, skip the ElementPath
+            if p.tag != prop or not len(p):
+                continue
             prop_name = p.attrib["name"]
-            stdset = p.attrib.get("stdset")
-            attrs = CUSTOM if stdset else ATTRS
-            child = p.find(".//")
-            tag = child.tag
-            value = child.text
-
-            # NOTE iconset
-            itr = child.itertext()
-            while isinstance(value, str) and not value.strip():
-                value = next(itr, "")
-            value = value if value else ""
-
-            # NOTE bool
-            value = value == "true" if tag == "bool" else value
-            menu_dict[attrs][prop_name] = value
+            child = p[0]
+            decoder = self.DECODERS.get(child.tag, decode_text)
+            try:
+                value = decoder(child)
+            except (TypeError, ValueError):
+                info = (child.tag, prop_name, element.attrib.get("name"))
+                self.issues.append("invalid %s property `%s` of `%s`" % info)
+                value = decode_text(child)
+            if p.attrib.get("stdset"):
+                custom_attrs[prop_name] = value
+            else:
+                attrs[prop_name] = value
 
         config = {}
-        attrs = menu_dict.pop(ATTRS, {})
         for k, v in mapping.items():
-            value = attrs.pop(v, None)
+            value = attrs.get(v)
             if not value is None:
-                config[k] = os.path.basename(value) if v == "icon" else value
+                is_icon = v == "icon"
+                config[k] = intern_text(os.path.basename(value)) if is_icon else value
 
-        custom_attrs = menu_dict.pop(CUSTOM, {})
         _config = custom_attrs.pop("config", {})
         try:
-            _config = byteify(json.loads(_config)) if _config else {}
-        except json.JSONDecodeError:
+            _config = decode_json(_config) if _config else {}
+        except ValueError as e:
+            info = (element.attrib.get("name"), e)
+            self.issues.append("invalid json config of `%s`: %s" % info)
             _config = {}
         config.update(_config)
         config.update(custom_attrs)
 
-        return self.parse_script_flag(config, element.attrib.get("name"))
+        return config
 
-    @abc.abstractmethod
-    def register(self):
-        """register
-        register the ui into MayaWindow
+    def get_config(self, data):
+        """resolve the script and icon flags on a copy of the extracted config"""
+        config = dict(data.get("config", {}))
+        config = self.parse_icon_flag(config)
+        return self.parse_script_flag(config, data.get("object_name"))
+
+    def extract(self):
+        """extract
+        extract the parser-neutral data from the ui root
+        the data must be json serializable for the cache
+
+        :return: widget tree data
+        :rtype: list
         """
+        return []
+
+    def validate(self, tree):
+        """validate
+        resolve the callbacks of the extracted tree without creating the ui
+
+        :param tree: extracted tree data
+        :type tree: list
+        :return: issue messages
+        :rtype: list
+        """
+        issues = []
+        for data in tree:
+            for value in self.get_config(data).values():
+                if not isinstance(value, Callback):
+                    continue
+                info = (value.script, data.get("object_name"))
+                try:
+                    callback = value.resolve()
+                except Exception as e:
+                    # NOTE the module with the syntax or import error
+                    info = (value.module_name,) + info + (e,)
+                    issues.append("cannot import `%s` for `%s` of `%s`: %s" % info)
+                    continue
+                if callback is None:
+                    issues.append("unresolved callback `%s` of `%s`" % info)
+            issues.extend(self.validate(data.get("items", [])))
+        return issues
+
+    def can_insert(self, parent):
+        """the parser could create the item at the specific position"""
+        return False
+
+    def can_edit(self, state, data):
+        """the registered ui could be edited into the new data"""
+        if state.get("class") != data.get("class"):
+            return False
+        config = state.get("config", {})
+        new_config = data.get("config", {})
+        if config == new_config:
+            return True
+        # NOTE the parser without edit_item recreate the changed item
+        edit_item = six.get_unbound_function(type(self).edit_item)
+        if edit_item is six.get_unbound_function(UIParser.edit_item):
+            return False
+        # NOTE removed flag cannot be reset by edit
+        return set(config) <= set(new_config)
+
+    def exists(self, state):
+        # NOTE the failed create leave an empty ui list
+        ui_list = state.get("ui")
+        return bool(ui_list) and all(cmds.control(ui, ex=1) for ui in ui_list)
+
+    def is_lazy(self, data):
+        """the children of the item create on demand"""
+        return False
+
+    def get_kind(self, data, parent=None):
+        """deleteUI flag to batch delete the ui of the item"""
+        return self.KIND
+
+    def emit_item(self, data, parent=None, after=None):
+        """emit_item
+        describe the maya ui of a single extracted item as commands,
+        the commands run one by one or compile into a single mel script
+
+        :param data: extracted item data
+        :type data: dict
+        :param parent: parent ui name or the pending parent command
+        :type parent: str or Command, optional
+        :param after: insert after the ui name or the pending command
+        :type after: str or Command, optional
+        :return: command list create one ui each, None if it cannot be batched
+        :rtype: list
+        """
+        return None
+
+    def create_item(self, data, parent=None, after=None):
+        """create_item
+        create the maya ui for a single extracted item
+
+        :param data: extracted item data
+        :type data: dict
+        :param parent: parent ui name, defaults to the parser root ui
+        :type parent: str, optional
+        :param after: insert after the ui name, "" insert at the beginning
+        :type after: str, optional
+        :return: ui name list
+        :rtype: list
+        """
+        commands = self.emit_item(data, parent, after)
+        if commands is None:
+            raise NotImplementedError
+        return [command() for command in commands]
+
+    def edit_item(self, state, changes, parent=None):
+        """edit_item
+        edit the registered ui with the changed flags
+
+        :param state: registered state
+        :type state: dict
+        :param changes: changed flags of the extracted config
+        :type changes: dict
+        :param parent: parent ui name, defaults to the parser root ui
+        :type parent: str, optional
+        """
+        raise NotImplementedError
+
+    def delete_item(self, state):
+        delete_ui({state.get("kind", self.KIND): state.get("ui", [])})
+
+    def reconcile(self, states, tree, parent=None, depth=0):
+        """reconcile
+        compare the registered states with the new tree
+        only generate the operations that actually needed
+
+        :param states: registered state list
+        :type states: list
+        :param tree: extracted tree data
+        :type tree: list
+        :param parent: parent state, defaults to None
+        :type parent: dict, optional
+        :param depth: depth of the tree, defaults to 0
+        :type depth: int, optional
+        :return: new state list and the operation list
+        :rtype: tuple
+        """
+        new_states = []
+        operations = []
+
+        def get_keys(items):
+            counter = defaultdict(int)
+            for item in items:
+                name = item.get("object_name", "")
+                counter[name] += 1
+                yield "%s#%s" % (name, counter[name])
+
+        state_dict = {}
+        for index, (key, state) in enumerate(zip(get_keys(states), states)):
+            state_dict[key] = (index, state)
+        keys = list(get_keys(tree))
+        for key in set(state_dict) - set(keys):
+            operations.append(Operation(Operation.DELETE, self, state_dict[key][1]))
+
+        insertable = self.can_insert(parent)
+        last_index = -1
+        reorder = False
+        after = None
+        for key, data in zip(keys, tree):
+            index, state = state_dict.get(key, (-1, None))
+            new_state = {k: v for k, v in data.items() if k != "items"}
+            is_keep = not reorder and index > last_index and state is not None
+            # NOTE create again the item failed last time
+            is_keep = is_keep and bool(state.get("ui")) and not state.get("dirty")
+            if is_keep and self.can_edit(state, data):
+                last_index = index
+                config = state.get("config", {})
+                changes = {
+                    k: v
+                    for k, v in data.get("config", {}).items()
+                    if config.get(k) != v
+                }
+                items = state.pop("items", [])
+                pending = state.get("pending", False)
+                # NOTE update in place, the ui callbacks may hold the state
+                state.update(new_state)
+                new_state = state
+                if changes:
+                    op = Operation(Operation.EDIT, self, new_state, parent)
+                    op.changes = changes
+                    operations.append(op)
+            else:
+                if state is not None:
+                    operations.append(Operation(Operation.DELETE, self, state))
+                new_state["ui"] = []
+                new_state["kind"] = self.get_kind(data, parent)
+                op = Operation(Operation.CREATE, self, new_state, parent, after)
+                operations.append(op)
+                # NOTE keep the order for the parser cannot insert
+                reorder = not insertable
+                items = []
+                pending = True
+
+            if "items" in data and self.is_lazy(data) and pending:
+                # NOTE keep the extracted tree until the ui materialize
+                new_state["items"] = data["items"]
+                new_state["pending"] = True
+            elif "items" in data:
+                res = self.reconcile(items, data["items"], new_state, depth + 1)
+                new_state["items"], child_operations = res
+                for operation in child_operations:
+                    operation.top = new_state.get("object_name")
+                operations.extend(child_operations)
+            new_states.append(new_state)
+            after = new_state
+
+        for operation in operations:
+            if operation.depth is None:
+                operation.depth = depth
+        return new_states, operations
+
+    def plan(self, tree, states=None):
+        """plan
+        reconcile the tree with the registered states still exists
+
+        :return: new state list and the operation list
+        :rtype: tuple
+        """
+        states = [state for state in states or [] if self.exists(state)]
+        return self.reconcile(states, tree)
+
+    @staticmethod
+    def execute(operations, stats=None):
+        for operation in operations:
+            operation()
+            if stats is not None:
+                stats[operation.action] = stats.get(operation.action, 0) + 1
+
+    def materialize(self, state):
+        """materialize
+        create the children ui of the lazy state on demand
+
+        :param state: registered state with the pending extracted items
+        :type state: dict
+        """
+        if not state.pop("pending", False):
+            return
+        states, operations = self.reconcile([], state.get("items", []), state)
+        state["items"] = states
+        self.execute(operations)
+
+    @staticmethod
+    def get_ui_list(states):
+        ui_list = []
+        for state in states:
+            ui_list.extend(state.get("ui", []))
+            ui_list.extend(UIParser.get_ui_list(state.get("items", [])))
+        return ui_list
 
     @classmethod
-    def build(cls, ui_path, py_dict, flag=""):
+    def parse_xml(cls, content, parsers):
+        """parse_xml
+        stream the subtrees declared by the parsers, the designer only parts
+        like the layouts and the unused pages never stay in memory
+
+        :param content: ui file content
+        :type content: bytes
+        :param parsers: parser class list
+        :type parsers: list
+        :return: ui root element
+        :rtype: Element
+        """
+        subtrees = [("widget", "Module_PTE", None)]
+        for parser in parsers:
+            if parser.SUBTREES is None:
+                return ET.fromstring(content)
+            subtrees.extend(parser.SUBTREES)
+        return SubtreeBuilder.parse(content, subtrees)
+
+    @classmethod
+    def compile_ui(cls, root, parsers, issues=None):
+        """compile_ui
+
+        :param root: ui root element
+        :type root: Element
+        :param parsers: parser class list
+        :type parsers: list
+        :param issues: collect the parser issues, defaults to None
+        :type issues: list, optional
+        :return: parser-neutral data for the ui file
+        :rtype: dict
+        """
+        data = {"module": None, "widgets": {}}
+        index = DocumentIndex(root)
+        element = index.find("Module_PTE")
+        if element is not None:
+            element = element.find("./property[@name='plainText']/string")
+        if hasattr(element, "text"):
+            data["module"] = unescape(element.text or "")
+
+        for parser in parsers:
+            key = parser.TYPE if parser.TYPE else parser.__name__
+            with PROFILER.span("property decode"), PROFILER.span(key):
+                instance = parser(root, {}, index)
+                tree = instance.extract()
+            if issues is not None:
+                issues.extend(instance.issues)
+            data["widgets"][key] = {"version": parser.VERSION, "items": tree}
+        return data
+
+    @classmethod
+    def load_data(cls, ui_path, parsers, cache=None):
+        """load_data
+        load the parser-neutral data, no maya call inside
+        safe to run in the worker thread, prefer the compiled artifact
+
+        :param ui_path: UIBot.ui path
+        :type ui_path: str
+        :param parsers: parser class list to extract
+        :type parsers: list
+        :param cache: skip the xml parsing if the data cached, defaults to None
+        :type cache: IRCache, optional
+        :return: parser-neutral data for the ui file
+        :rtype: dict
+        """
+        prefetched = PREFETCHER.pop(ui_path)
+        if prefetched:
+            content = prefetched[0]
+        else:
+            with open(ui_path, "rb") as f:
+                content = f.read()
+        # NOTE the artifact is validated against the content hash
+        data = Artifact.load(ui_path, parsers, content)
+        if data is not None:
+            return data
+
+        key = cache.get_key(ui_path, content) if cache else ""
+        data, missing = cache.load(key, parsers) if cache else (None, parsers)
+        if data is None or missing:
+            with PROFILER.span("xml parse"), PROFILER.span(os.path.basename(ui_path)):
+                root = cls.parse_xml(content, missing)
+            res = cls.compile_ui(root, missing)
+            if data is None:
+                data = res
+            else:
+                data["widgets"].update(res["widgets"])
+            if cache:
+                cache.dump(key, data)
+        return data
+
+    @classmethod
+    def build(cls, ui_path, py_dict, parsers, cache=None, state=None, data=None):
         """build
 
         :param ui_path: UIBot.ui path
         :type ui_path: str
         :param py_dict: name<=>module dict
-        :type py_dict: dict
-        :param flag: register specific type parser, defaults to "all"
-        :type flag: str, optional
-        :return: ui name list
+        :type py_dict: ModuleDict
+        :param parsers: parser class list to register
+        :type parsers: list
+        :param cache: skip the xml parsing if the data cached, defaults to None
+        :type cache: IRCache, optional
+        :param state: type<=>registered state dict, update in place
+        :type state: dict, optional
+        :param data: data from load_data, defaults to None
+        :type data: dict, optional
+        :return: operation list to create the ui
         :rtype: list
         """
-        tree = ET.parse(ui_path)
-        root = tree.getroot()
-
-        # NOTE load plaintext as empty module
-        path = ".//widget[@name='Module_PTE']/property[@name='plainText']/string"
-        element = root.find(path)
-        if hasattr(element, "text"):
-            code = unescape(element.text)
-            module = imp.new_module("__UIBot_Internal_Module__")
-            six.exec_(code, module.__dict__)
-            py_dict[""] = module
-
-        widget_dict = {}
-        for parser in cls.__subclasses__():
-            res = []
-            if parser.TYPE == flag or flag == "all":
-                res = parser(root, py_dict).register()
+        if data is None:
+            data = cls.load_data(ui_path, parsers, cache)
+
+        # NOTE `@:func` resolve in the Module_PTE module of this ui file only
+        # the callbacks resolve lazily, keep the module for the ui file
+        py_dict = py_dict.copy()
+        source = data.get("module")
+        if source is not None:
+            # NOTE the artifact provide the compiled code
+            try:
+                py_dict.cache.load_embedded(ui_path, source, data.get("code"))
+            except Exception:
+                # NOTE only this file lose its `@:` callbacks, keep registering
+                traceback.print_exc()
+                msg = "UIBot cannot run the Module_PTE code of %s" % ui_path
+                OpenMaya.MGlobal.displayError(msg)
+            py_dict.ui_path = ui_path
+
+        state = {} if state is None else state
+        operations = []
+        for parser in parsers:
             key = parser.TYPE if parser.TYPE else parser.__name__
-            widget_dict[key] = list(res)
+            tree = data["widgets"][key]["items"]
+            states, res = parser(None, py_dict).plan(tree, state.get(key))
+            state[key] = states
+            operations.extend(res)
+
+        return operations
+
+
+class UIRegistry(object):
+    """
+    ui path => parser type => registered states
+    the ui paths of each type are indexed, a single file deregister directly
+    """
+
+    def __init__(self):
+        self.files = {}
+        self.types = defaultdict(set)
+
+    def __contains__(self, ui_path):
+        return ui_path in self.files
+
+    def paths(self, flag="all"):
+        if flag == "all":
+            return sorted(self.files)
+        return sorted(self.types.get(flag, []))
 
-        return widget_dict
+    def keys(self, ui_path=None):
+        """registered parser types of the ui file, or of any file"""
+        if ui_path is not None:
+            return sorted(self.files.get(ui_path, {}))
+        return sorted(key for key, paths in self.types.items() if paths)
+
+    def get(self, ui_path):
+        """type => states dict of the ui file, the build update it in place"""
+        return self.files.setdefault(ui_path, {})
+
+    def index(self, ui_path):
+        for key in self.files.get(ui_path, {}):
+            self.types[key].add(ui_path)
+
+    def pop(self, ui_path, flag="all"):
+        """pop
+
+        :param ui_path: registered ui path
+        :type ui_path: str
+        :param flag: parser type to pop, defaults to "all"
+        :type flag: str, optional
+        :return: type => popped states
+        :rtype: dict
+        """
+        state = self.files.get(ui_path, {})
+        keys = list(state) if flag == "all" else [flag]
+        popped = {}
+        for key in keys:
+            if key in state:
+                popped[key] = state.pop(key)
+            self.types.get(key, set()).discard(ui_path)
+        if not state:
+            self.files.pop(ui_path, None)
+        return popped
+
+    def pop_ui(self, ui_path, flag="all"):
+        """pop_ui
+
+        :return: deleteUI flag => top level ui name list of the popped states
+        :rtype: dict
+        """
+        ui_dict = defaultdict(list)
+        for states in self.pop(ui_path, flag).values():
+            # NOTE the children are deleted with the top level ui
+            for state in states:
+                ui_dict[state.get("kind", UIParser.KIND)].extend(state.get("ui", []))
+        return ui_dict
+
+    def get_states(self, paths, flag="all"):
+        """registered states of the files and their children"""
+        states = []
+        stack = []
+        for path in paths:
+            for key, items in self.files.get(path, {}).items():
+                if flag == "all" or key == flag:
+                    stack.extend(items)
+        while stack:
+            state = stack.pop()
+            states.append(state)
+            stack.extend(state.get("items", []))
+        return states
+
+    def get_ui_list(self, flag="all", ui_path=None):
+        paths = [ui_path] if ui_path else self.paths(flag)
+        ui_list = []
+        for path in paths:
+            for key, states in self.files.get(path, {}).items():
+                if flag == "all" or key == flag:
+                    ui_list.extend(UIParser.get_ui_list(states))
+        return ui_list
+
+
+class ParserRegistry(object):
+    """
+    TYPE<=>parser registry
+    the `<TYPE>_parser.py` files under the paths is the manifest,
+    the parser module is loaded when the TYPE requested
+    """
+
+    def __init__(self, cache, folders=None):
+        self.cache = cache
+        self.folders = folders if folders else FolderCache()
+        self.paths = {}
+        self.parsers = {}
+        # NOTE TYPE => parser file path of the loaded parser
+        self.sources = {}
+        # NOTE parser file path => module checked for the mismatched TYPE
+        self.checked = {}
+
+    # NOTE the parser methods no longer called, the ui is created by the plan
+    LEGACY = ["register", "create_ui"]
+
+    def register(self, parser):
+        key = parser.TYPE if parser.TYPE else parser.__name__
+        # NOTE skip the ABCMeta.register of the metaclass
+        mro = parser.__mro__
+        legacy = [name for name in self.LEGACY if any(name in vars(c) for c in mro)]
+        if legacy:
+            info = (key, ", ".join(legacy))
+            msg = "UIBot parser `%s` override the ignored %s, implement emit_item"
+            OpenMaya.MGlobal.displayWarning(msg % info)
+        self.parsers[key] = parser
+        return parser
+
+    def scan(self, folders, check=True):
+        self.paths = {}
+        suffix = "%s.py" % PARSER_SUFFIX
+        for path in self.folders.files(folders, suffix, check):
+            name = os.path.splitext(os.path.basename(path))[0]
+            self.paths.setdefault(name[: -len(PARSER_SUFFIX)], path)
+        # NOTE drop the loaded parser of the removed file
+        for key in [key for key in self.sources if key not in self.paths]:
+            self.checked.pop(self.sources.pop(key), None)
+            self.parsers.pop(key, None)
+
+    def keys(self):
+        return sorted(set(self.paths) | set(self.parsers))
+
+    def load(self, key):
+        path = self.paths.get(key)
+        if path:
+            name = os.path.splitext(os.path.basename(path))[0]
+            module = self.cache.load(path, "__UIBot_%s__" % name)
+            self.sources[key] = path
+            if self.checked.get(path) is not module:
+                self.checked[path] = module
+                self.check(key, module)
+            # NOTE parser without the register_parser decorator
+            parser = self.parsers.get(key)
+            if parser is None or getattr(module, parser.__name__, None) is not parser:
+                for value in vars(module).values():
+                    is_class = isinstance(value, type) and value is not UIParser
+                    if is_class and issubclass(value, UIParser):
+                        if (value.TYPE if value.TYPE else value.__name__) == key:
+                            self.register(value)
+        return self.parsers.get(key)
+
+    @staticmethod
+    def check(key, module):
+        """warn the parsers of the file only loaded by another TYPE"""
+        for value in vars(module).values():
+            is_class = isinstance(value, type) and value is not UIParser
+            if not is_class or not issubclass(value, UIParser):
+                continue
+            name = value.TYPE if value.TYPE else value.__name__
+            if value.__module__ == module.__name__ and name != key:
+                info = (name, module.__file__, key, name, PARSER_SUFFIX)
+                msg = "UIBot parser `%s` in %s is loaded as `%s`, rename to `%s%s.py`"
+                OpenMaya.MGlobal.displayWarning(msg % info)
+
+    def get(self, flag="all"):
+        keys = self.keys() if flag == "all" else [flag]
+        return [parser for parser in map(self.load, keys) if parser]
+
+
+def register_parser(parser):
+    """register_parser
+    class decorator to register the UIParser into the registry
+
+    :param parser: UIParser subclass
+    :type parser: type
+    :return: the registered parser
+    :rtype: type
+    """
+    return UIBotMixin.PARSERS.register(parser)
 
 
 class Flag:
@@ -253,17 +2364,49 @@ class Flag:
     PATH_LONG = "-path"
     AUTO = "-a"
     AUTO_LONG = "-auto"
+    CACHE = "-c"
+    CACHE_LONG = "-cache"
+    BUDGET = "-b"
+    BUDGET_LONG = "-budget"
+    PROGRESS = "-pg"
+    PROGRESS_LONG = "-progress"
+    PROFILE = "-pf"
+    PROFILE_LONG = "-profile"
+    TRACE = "-tr"
+    TRACE_LONG = "-trace"
+    WATCH = "-wt"
+    WATCH_LONG = "-watch"
+    FILE = "-f"
+    FILE_LONG = "-file"
     HELP = "-h"
     HELP_LONG = "-help"
 
 
 class Options:
     register = "_".join([PLUGIN_NAME, "register"])
+    budget = "_".join([PLUGIN_NAME, "budget"])
+    watch = "_".join([PLUGIN_NAME, "watch"])
 
 
 class UIBotMixin(object):
+    # NOTE type => ui name list of all the ui files
     UI_DICT = {}
     PATHS = [config_folder] if os.path.isdir(config_folder) else []
+    IR_CACHE = IRCache(os.path.join(CACHE_DIR, "ir"))
+    MODULE_CACHE = ModuleCache()
+    FOLDER_CACHE = FolderCache()
+    PARSERS = ParserRegistry(MODULE_CACHE, FOLDER_CACHE)
+    SCHEDULER = Scheduler(os.getenv("MAYA_UIBOT_BACKEND", "python"))
+    WATCHER = Watcher(lambda paths: UIBotMixin.reload_ui(paths))
+    WORKERS = int(os.getenv("MAYA_UIBOT_WORKERS", "1"))
+    PREFETCH_TIMEOUT = float(os.getenv("MAYA_UIBOT_PREFETCH_TIMEOUT", "30"))
+    # NOTE local copy of the config folders capped to MAYA_UIBOT_MIRROR_SIZE MB
+    MIRROR_SIZE = float(os.getenv("MAYA_UIBOT_MIRROR_SIZE", "0")) * 1024 * 1024
+    MIRROR = None
+    if MIRROR_SIZE > 0:
+        MIRROR = Mirror(os.path.join(CACHE_DIR, "mirror"), MIRROR_SIZE)
+    # NOTE ui path => type => registered state for reconcile
+    REGISTRY = UIRegistry()
 
     @classmethod
     def get_flag_arg(cls, parser, flag, flag_list, enable_none=False):
@@ -275,62 +2418,195 @@ class UIBotMixin(object):
         return f
 
     @classmethod
-    def get_ui_list(cls, flag, clear=True):
-        if flag == "all":
-            ui_list = list(chain.from_iterable(cls.UI_DICT.values()))
-            if clear:
-                cls.UI_DICT = {}
-        else:
-            ui_list = cls.UI_DICT[flag]
-            if clear:
-                cls.UI_DICT[flag] = []
-        return ui_list
+    def get_paths(cls):
+        """config folders to read, the synced local mirror if enabled"""
+        if cls.MIRROR is None:
+            return cls.PATHS
+        return [cls.MIRROR.get_path(path) for path in cls.PATHS]
+
+    @classmethod
+    def sync(cls):
+        """sync the local mirror in a thread, reload the changed files after"""
+        if cls.MIRROR is not None:
+            cls.MIRROR.start(cls.PATHS, cls.reload_ui)
 
     @classmethod
-    def deregister_ui(cls, flag="all"):
+    def get_ui_path(cls, ui_path):
+        """match the registered or the listed ui file of the path"""
+        norm = lambda path: os.path.normcase(os.path.normpath(path))
+        target = norm(ui_path)
+        paths = cls.REGISTRY.paths() + cls.FOLDER_CACHE.files(cls.get_paths(), ".ui")
+        for path in paths:
+            if norm(path) == target:
+                return path
+        return ui_path
+
+    @classmethod
+    def get_ui_list(cls, flag, ui_path=None):
+        return cls.REGISTRY.get_ui_list(flag, ui_path)
+
+    @classmethod
+    def delete_states(cls, ui_paths, flag="all"):
+        """delete the registered ui of the files
+
+        :return: ui count to delete
+        :rtype: int
+        """
+        ui_dict = defaultdict(list)
+        for ui_path in ui_paths:
+            for kind, ui_list in cls.REGISTRY.pop_ui(ui_path, flag).items():
+                ui_dict[kind].extend(ui_list)
+        return delete_ui(ui_dict)
+
+    @classmethod
+    def deregister_ui(cls, flag="all", ui_path=None):
+        """deregister_ui
+
+        :param flag: parser type to deregister, defaults to "all"
+        :type flag: str, optional
+        :param ui_path: only deregister the ui file, defaults to all the files
+        :type ui_path: str, optional
+        """
         if not flag:
             return
-        ui_list = cls.get_ui_list(flag)
-        for ui_name in ui_list:
-            if not ui_name:
-                continue
+        paths = [ui_path] if ui_path else cls.REGISTRY.paths(flag)
+        # NOTE never create the pending ui only to delete it
+        cls.SCHEDULER.cancel(cls.REGISTRY.get_states(paths, flag))
+        cls.delete_states(paths, flag)
+        cls.update_widgets(list(cls.UI_DICT) if flag == "all" else [flag])
+
+    @classmethod
+    def register_ui(cls, flag="all", budget=0.0, files=None):
+        """register_ui
+
+        :param flag: parser type to register, defaults to "all"
+        :type flag: str, optional
+        :param budget: seconds for each idle slice, 0 run at once
+        :type budget: float, optional
+        :param files: only register these ui files, defaults to all the ui files
+        :type files: list, optional
+        """
+        # NOTE the reconcile need the pending ui created
+        cls.SCHEDULER.flush()
+        ui_list = []
+        py_dict = ModuleDict(cls.MODULE_CACHE)
+        Callback.CACHE.clear()
+        PROFILER.reset()
+        # NOTE the files read by userSetup while maya is starting,
+        # the mirror register from the local copy and never use them
+        if cls.MIRROR is None:
+            with PROFILER.span("prefetch wait"):
+                PREFETCHER.wait(cls.PREFETCH_TIMEOUT)
+        paths = cls.get_paths()
+        ICONS.update(ICONS.get_folders(paths))
+        ui_list.extend(cls.FOLDER_CACHE.files(paths, ".ui"))
+        # NOTE the folders just revalidated, reuse the snapshot
+        for py in cls.FOLDER_CACHE.files(paths, ".py", False):
+            name = os.path.splitext(os.path.basename(py))[0]
+            py_dict.paths[name] = py
+
+        stats = dict.fromkeys([Operation.CREATE, Operation.EDIT, Operation.DELETE], 0)
+        # NOTE the ui file removed from the paths
+        removed = set(cls.REGISTRY.paths(flag)) - set(ui_list)
+        stats[Operation.DELETE] += cls.delete_states(removed, flag)
+
+        if files is not None:
+            ui_list = [ui_path for ui_path in ui_list if ui_path in set(files)]
+        cls.PARSERS.scan(paths, False)
+        parsers = cls.PARSERS.get(flag)
+        # NOTE parse the ui files in the worker threads, create ui in main thread
+        load_data = partial(UIParser.load_data, parsers=parsers, cache=cls.IR_CACHE)
+        # NOTE the threads only pay off to overlap the reads of the remote files,
+        # the prefetched content is in memory and the mirror is on the local disk
+        is_read = lambda ui_path: not PREFETCHER.contains(ui_path)
+        reads = [] if cls.MIRROR is not None else list(filter(is_read, ui_list))
+        workers = min(cls.WORKERS, len(reads))
+        if workers > 1:
+            pool = ThreadPool(workers)
             try:
-                cmds.deleteUI(ui_name)
-            except RuntimeError:
-                pass
+                data_list = pool.map(load_data, ui_list)
+            finally:
+                pool.close()
+        else:
+            data_list = [load_data(ui_path) for ui_path in ui_list]
+
+        operations = []
+        for ui_path, data in zip(ui_list, data_list):
+            state = cls.REGISTRY.get(ui_path)
+            res = UIParser.build(ui_path, py_dict, parsers, cls.IR_CACHE, state, data)
+            cls.REGISTRY.index(ui_path)
+            operations.extend(res)
+
+        keys = [parser.TYPE if parser.TYPE else parser.__name__ for parser in parsers]
+        callback = partial(cls.update_widgets, keys, stats)
+        cls.SCHEDULER.submit(operations, stats, callback, budget)
 
     @classmethod
-    def register_ui(cls, flag="all"):
+    def watch(cls, interval):
+        """start watching the config files, 0 stop the watcher"""
+        if interval > 0:
+            cls.WATCHER.start(cls.PATHS, interval)
+        else:
+            cls.WATCHER.stop()
 
-        # NOTES(timmyliang) reset __subclasses__
-        module = imp.load_source("UIBot", __file__)
-        sys.modules["UIBot"] = module
+    @classmethod
+    def reload_ui(cls, paths):
+        """reload_ui
+        register again the parser types and the ui files changed on disk
 
-        ui_list = []
-        py_dict = {}
-        for folder in cls.PATHS:
-            ui_path = os.path.join(folder, "*.ui")
-            ui_list.extend(glob.glob(ui_path))
-            for py in glob.iglob(os.path.join(folder, "*.py")):
-                name = os.path.splitext(os.path.basename(py))[0]
-                py_dict[name] = imp.load_source("__UIBot_%s__" % name, py)
-
-        cls.deregister_ui(flag)
-        for ui_path in ui_list:
-            cls.UI_DICT.update(module.UIParser.build(ui_path, py_dict, flag))
+        :param paths: changed ui and parser file paths
+        :type paths: list
+        """
+        print("UIBot reload:", paths)
+        if cls.MIRROR is not None:
+            # NOTE the watched network files reload after synced to the mirror
+            if not all(cls.MIRROR.contains(path) for path in paths):
+                cls.sync()
+            paths = [path for path in paths if cls.MIRROR.contains(path)]
+        # NOTE only reload the types actually registered, not the auto register
+        registered = cls.REGISTRY.keys()
+        suffix = "%s.py" % PARSER_SUFFIX
+        keys = []
+        for path in paths:
+            name = os.path.basename(path)
+            if name.endswith(suffix):
+                keys.append(name[: -len(suffix)])
+        keys = [key for key in keys if key in registered]
+        if keys:
+            # NOTE the changed parser may extract different data
+            cls.IR_CACHE.invalidate("all")
+            cls.PARSERS.scan(cls.get_paths())
+        for key in keys:
+            if key in cls.PARSERS.keys():
+                cls.register_ui(key)
+            else:
+                # NOTE the parser file removed
+                cls.deregister_ui(key)
+
+        # NOTE the new ui file take all the registered types
+        types = defaultdict(list)
+        for ui_path in paths:
+            if not os.path.normcase(ui_path).endswith(".ui"):
+                continue
+            for key in cls.REGISTRY.keys(ui_path) or registered:
+                if key not in keys:
+                    types[key].append(ui_path)
+        for key in sorted(types):
+            cls.register_ui(key, files=types[key])
+
+    @classmethod
+    def update_widgets(cls, keys, stats=None):
+        for key in keys:
+            cls.UI_DICT[key] = cls.REGISTRY.get_ui_list(key)
+        if stats is not None:
+            print("UIBot reconcile:", stats)
+            if PROFILER.trace_path:
+                PROFILER.dump()
 
     @classmethod
     def update_UI_DICT(cls):
-        module = imp.load_source("UIBot", __file__)
-        sys.modules["UIBot"] = module
-        for path in cls.PATHS:
-            for py in glob.iglob(os.path.join(path, "*.py")):
-                imp.load_source("__UIBot_Module__", py)
-
-        key_set = set()
-        for parser in module.UIParser.__subclasses__():
-            key = parser.TYPE if parser.TYPE else parser.__name__
-            key_set.add(key)
+        cls.PARSERS.scan(cls.get_paths())
+        key_set = set(cls.PARSERS.keys())
 
         for k in cls.UI_DICT:
             if k not in key_set:
@@ -344,7 +2620,6 @@ class UIBotCmd(OpenMayaMPx.MPxCommand, UIBotMixin):
     name = PLUGIN_NAME
     job_index = 0
 
-    @log_time
     def doIt(self, args):
         cls = self.__class__
         flag_list = ["all"] + list(cls.UI_DICT.keys())
@@ -357,19 +2632,49 @@ class UIBotCmd(OpenMayaMPx.MPxCommand, UIBotMixin):
         is_widget = is_flag_set(Flag.WIDGET) | is_flag_set(Flag.WIDGET_LONG)
         is_path = is_flag_set(Flag.PATH) | is_flag_set(Flag.PATH_LONG)
         is_auto = is_flag_set(Flag.AUTO) | is_flag_set(Flag.AUTO_LONG)
+        is_cache = is_flag_set(Flag.CACHE) | is_flag_set(Flag.CACHE_LONG)
+        is_budget = is_flag_set(Flag.BUDGET) | is_flag_set(Flag.BUDGET_LONG)
+        is_progress = is_flag_set(Flag.PROGRESS) | is_flag_set(Flag.PROGRESS_LONG)
+        is_profile = is_flag_set(Flag.PROFILE) | is_flag_set(Flag.PROFILE_LONG)
+        is_trace = is_flag_set(Flag.TRACE) | is_flag_set(Flag.TRACE_LONG)
+        is_watch = is_flag_set(Flag.WATCH) | is_flag_set(Flag.WATCH_LONG)
+        is_file = is_flag_set(Flag.FILE) | is_flag_set(Flag.FILE_LONG)
         is_help = is_flag_set(Flag.HELP) | is_flag_set(Flag.HELP_LONG)
 
+        # NOTE the file flag filter the register, deregister and widget flags
         num_flags = parser.numberOfFlagsUsed()
-        if num_flags != 1 or is_help:
+        is_filter = is_file and num_flags > 1
+        if num_flags - is_filter != 1 or is_help:
             OpenMaya.MGlobal.displayInfo(__doc__)
             return
 
         if parser.isQuery():
+            if is_filter:
+                # NOTE the query flags carry no argument, the file is unknown
+                msg = "UIBot query cannot filter by file, "
+                msg += "use `cmds.UIBot(w=type, f=path)` instead"
+                OpenMaya.MGlobal.displayError(msg)
+                return
             res_list = cls.UI_DICT.keys()
             if is_auto:
                 res_list = cmds.optionVar(q=Options.register)
             elif is_path:
                 res_list = cls.PATHS
+            elif is_cache:
+                res_list = json.dumps(cls.IR_CACHE.stats)
+            elif is_budget:
+                res_list = cmds.optionVar(q=Options.budget)
+            elif is_progress:
+                res_list = json.dumps(cls.SCHEDULER.progress())
+            elif is_profile:
+                res_list = json.dumps(PROFILER.to_dict())
+            elif is_trace:
+                res_list = PROFILER.trace_path
+            elif is_watch:
+                watcher = cls.WATCHER
+                res_list = watcher.interval if watcher.is_running() else 0.0
+            elif is_file:
+                res_list = cls.REGISTRY.paths()
             self.appendToResult(res_list)
             return
 
@@ -377,22 +2682,47 @@ class UIBotCmd(OpenMayaMPx.MPxCommand, UIBotMixin):
             num = parser.numberOfFlagUses(Flag.PATH)
             cls.PATHS = [parser.flagArgumentString(Flag.PATH, i) for i in range(num)]
             cls.update_UI_DICT()
+            if cls.WATCHER.is_running():
+                cls.watch(cls.WATCHER.interval)
+            cls.sync()
 
         if is_auto:
             flag = cls.get_flag_arg(parser, Flag.AUTO, flag_list, True)
             cmds.optionVar(sv=[Options.register, flag])
 
+        if is_cache:
+            ui_path = parser.flagArgumentString(Flag.CACHE, 0)
+            cls.IR_CACHE.invalidate(ui_path)
+            if ui_path == "all":
+                cls.FOLDER_CACHE.invalidate()
+
+        if is_budget:
+            budget = parser.flagArgumentDouble(Flag.BUDGET, 0)
+            cmds.optionVar(fv=[Options.budget, budget])
+
+        if is_trace:
+            PROFILER.trace_path = parser.flagArgumentString(Flag.TRACE, 0)
+
+        if is_watch:
+            interval = parser.flagArgumentDouble(Flag.WATCH, 0)
+            cmds.optionVar(fv=[Options.watch, interval])
+            cls.watch(interval)
+
+        ui_path = None
+        if is_filter:
+            ui_path = cls.get_ui_path(parser.flagArgumentString(Flag.FILE, 0))
+
         if is_widget:
             flag = cls.get_flag_arg(parser, Flag.WIDGET, flag_list)
-            ui_list = cls.get_ui_list(flag, False)
+            ui_list = cls.get_ui_list(flag, ui_path)
             self.appendToResult(ui_list)
 
         elif is_register:
             flag = cls.get_flag_arg(parser, Flag.REGISTER, flag_list)
-            self.register_ui(flag)
+            self.register_ui(flag, files=[ui_path] if ui_path else None)
         elif is_deregister:
             flag = cls.get_flag_arg(parser, Flag.DEREGISTER, flag_list)
-            self.deregister_ui(flag)
+            self.deregister_ui(flag, ui_path)
 
         # return self.redoIt(args)
 
@@ -416,6 +2746,13 @@ class UIBotCmd(OpenMayaMPx.MPxCommand, UIBotMixin):
         syntax.addFlag(Flag.DEREGISTER, Flag.DEREGISTER_LONG, OpenMaya.MSyntax.kString)
         syntax.addFlag(Flag.WIDGET, Flag.WIDGET_LONG, OpenMaya.MSyntax.kString)
         syntax.addFlag(Flag.AUTO, Flag.AUTO_LONG, OpenMaya.MSyntax.kString)
+        syntax.addFlag(Flag.CACHE, Flag.CACHE_LONG, OpenMaya.MSyntax.kString)
+        syntax.addFlag(Flag.BUDGET, Flag.BUDGET_LONG, OpenMaya.MSyntax.kDouble)
+        syntax.addFlag(Flag.PROGRESS, Flag.PROGRESS_LONG)
+        syntax.addFlag(Flag.PROFILE, Flag.PROFILE_LONG)
+        syntax.addFlag(Flag.TRACE, Flag.TRACE_LONG, OpenMaya.MSyntax.kString)
+        syntax.addFlag(Flag.WATCH, Flag.WATCH_LONG, OpenMaya.MSyntax.kDouble)
+        syntax.addFlag(Flag.FILE, Flag.FILE_LONG, OpenMaya.MSyntax.kString)
         syntax.addFlag(Flag.PATH, Flag.PATH_LONG, OpenMaya.MSyntax.kStringObjects)
         syntax.addFlag(Flag.HELP, Flag.HELP_LONG)
         syntax.makeFlagMultiUse(Flag.PATH)
@@ -434,8 +2771,17 @@ class UIBotCmd(OpenMayaMPx.MPxCommand, UIBotMixin):
         if not cmds.optionVar(exists=Options.register):
             cmds.optionVar(sv=(Options.register, "all"))
         flag = cmds.optionVar(q=Options.register)
-        if flag:
+        budget = 0.0
+        if cmds.optionVar(exists=Options.budget):
+            budget = cmds.optionVar(q=Options.budget) / 1000.0
+        if flag and budget > 0:
+            # NOTE create the ui in time slices while maya is idle
+            cls.register_ui(flag, budget)
+        elif flag:
             cmds.UIBot(r=flag)
+        if cmds.optionVar(exists=Options.watch):
+            cls.watch(cmds.optionVar(q=Options.watch))
+        cls.sync()
 
         cls.job_index = cmds.scriptJob(
             runOnce=True,
@@ -446,6 +2792,7 @@ class UIBotCmd(OpenMayaMPx.MPxCommand, UIBotMixin):
     @classmethod
     def on_pluigin_deregister(cls):
         # NOTES(timmyliang) deregsiter all UI
+        cls.WATCHER.stop()
         cmds.UIBot(d="all")
         if cmds.scriptJob(ex=cls.job_index):
             cmds.scriptJob(kill=cls.job_index)
@@ -475,6 +2822,61 @@ def uninitializePlugin(mobject):
         raise
 
 
-# NOTES(timmyliang) Code Test
+def compile_artifacts(paths):
+    """compile_artifacts
+    compile the ui files into the artifacts next to them, no maya call inside
+
+    :param paths: ui files or config folders
+    :type paths: list
+    :return: error count
+    :rtype: int
+    """
+    folders = [path for path in paths if os.path.isdir(path)]
+    ui_list = [path for path in paths if os.path.isfile(path)]
+    ui_list.extend(FolderCache().files(folders, ".ui"))
+    UIBotMixin.PARSERS.scan(UIBotMixin.PATHS + folders)
+    parsers = UIBotMixin.PARSERS.get("all")
+
+    errors = 0
+    for ui_path in ui_list:
+        try:
+            with open(ui_path, "rb") as f:
+                content = f.read()
+            data = UIParser.compile_ui(ET.fromstring(content), parsers)
+            path = Artifact.dump(ui_path, content, data)
+        except (IOError, OSError, SyntaxError, ET.ParseError) as e:
+            print("%s: %s" % (ui_path, e), file=sys.stderr)
+            errors += 1
+            continue
+        print("%s -> %s" % (ui_path, path))
+    return errors
+
+
+def main(argv=None):
+    description = "UIBot offline tools"
+    parser = argparse.ArgumentParser(prog=PLUGIN_NAME, description=description)
+    subparsers = parser.add_subparsers(dest="command")
+    compile_parser = subparsers.add_parser(
+        "compile", help="compile the ui files into the artifacts next to them"
+    )
+    compile_parser.add_argument(
+        "paths", nargs="*", help="ui files or folders, defaults to MAYA_UIBOT_PATH"
+    )
+    args = parser.parse_args(argv)
+
+    if args.command == "compile":
+        paths = args.paths
+        if not paths:
+            paths = os.getenv("MAYA_UIBOT_PATH", "").split(";") + UIBotMixin.PATHS
+            paths = [path for path in paths if os.path.isdir(path)]
+        return 1 if compile_artifacts(paths) else 0
+    parser.print_help()
+    return 1
+
+
 if __name__ == "__main__":
+    # NOTE mayapy -m UIBot compile D:/config
+    if sys.argv[1:]:
+        sys.exit(main())
+    # NOTES(timmyliang) Code Test
     UIBotCmd.register_ui()
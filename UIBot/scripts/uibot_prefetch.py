@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+read the UIBot config files in a thread while maya is starting
+the plugin take the prefetched content instead of reading the files again
+"""
+
+# Import future modules
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+# Import built-in modules
+import os
+import threading
+
+
+SUFFIXES = (".ui", ".py")
+
+
+def norm(path):
+    return os.path.normcase(os.path.abspath(path))
+
+
+class Prefetcher(object):
+    """
+    path<=>prefetched content, the python code is compiled in the thread
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.thread = None
+        # NOTE path => (mtime, size, content, code)
+        self.files = {}
+        self.stats = dict.fromkeys(["read", "hit", "stale"], 0)
+
+    def is_running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(self, folders):
+        """start
+
+        :param folders: config folders to prefetch
+        :type folders: list
+        """
+        if self.is_running():
+            return
+        folders = [folder for folder in folders if folder]
+        self.thread = threading.Thread(target=self.run, args=(folders,))
+        self.thread.daemon = True
+        self.thread.start()
+
+    def run(self, folders):
+        for folder in folders:
+            try:
+                names = sorted(os.listdir(folder))
+            except OSError:
+                continue
+            for name in names:
+                if not name.endswith(SUFFIXES):
+                    continue
+                path = os.path.join(folder, name)
+                try:
+                    stat = os.stat(path)
+                    with open(path, "rb") as f:
+                        content = f.read()
+                    code = None
+                    if name.endswith(".py"):
+                        code = compile(content, path, "exec")
+                except (IOError, OSError, SyntaxError, TypeError, ValueError):
+                    # NOTE leave the broken file to the plugin to report
+                    continue
+                item = (stat.st_mtime, stat.st_size, content, code)
+                with self.lock:
+                    self.files[norm(path)] = item
+                    self.stats["read"] += 1
+
+    def wait(self, timeout=None):
+        """wait the prefetch thread finished
+
+        :param timeout: seconds to wait, defaults to None wait until finished
+        :type timeout: float, optional
+        """
+        thread = self.thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def contains(self, path):
+        with self.lock:
+            return norm(path) in self.files
+
+    def pop(self, path, stat=None):
+        """pop
+
+        :param path: config file path
+        :type path: str
+        :param stat: stat result of the path, defaults to None
+        :type stat: os.stat_result, optional
+        :return: content and the compiled code, None if not prefetched or changed
+        :rtype: tuple
+        """
+        with self.lock:
+            item = self.files.pop(norm(path), None)
+        if item is None:
+            return None
+        try:
+            stat = stat or os.stat(path)
+        except OSError:
+            return None
+        is_stale = (stat.st_mtime, stat.st_size) != item[:2]
+        with self.lock:
+            self.stats["stale" if is_stale else "hit"] += 1
+        return None if is_stale else item[2:]
+
+
+PREFETCHER = Prefetcher()
@@ -19,6 +19,7 @@ import os
 import sys
 import subprocess
 from maya import cmds
+import uibot_prefetch
 
 try:
     import urllib.request as urllib2
@@ -74,6 +75,17 @@ class ModuleManager(object):
             print(status)
 
 
+def prefetch():
+    """read the config files in a thread, overlap the network io with maya startup"""
+    # NOTE the local mirror is registered instead, nothing to overlap
+    if float(os.getenv("MAYA_UIBOT_MIRROR_SIZE") or 0) > 0:
+        return
+    module_path = cmds.getModulePath(mn=MODULE_NAME)
+    folders = [os.path.join(module_path, "config")]
+    folders.extend(os.getenv("MAYA_UIBOT_PATH", "").split(";"))
+    uibot_prefetch.PREFETCHER.start(folders)
+
+
 def initialize():
     # ModuleManager.load_modules(VENDORS)
 
@@ -91,4 +103,5 @@ def initialize():
 
 if __name__ == "__main__":
     if not cmds.about(q=1, batch=1):
+        prefetch()
         cmds.evalDeferred(initialize, lp=1)
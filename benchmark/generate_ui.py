@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""
+generate a synthetic UIBot ui file
+
+python benchmark/generate_ui.py synthetic.ui --menus 10 --depth 3 --actions 50000
+"""
+
+# Import future modules
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+# Import built-in modules
+import argparse
+import xml.etree.ElementTree as ET
+
+
+MODULE = """# -*- coding: utf-8 -*-
+from __future__ import print_function
+
+
+def hello(*args):
+    print("hello")
+
+
+class OptionsBase(object):
+    @staticmethod
+    def options(*args):
+        print("options")
+"""
+ICON = "../icons/sun.png"
+
+
+def add_property(element, name, tag, text, stdset=True):
+    prop = ET.SubElement(element, "property", name=name)
+    if not stdset:
+        prop.set("stdset", "0")
+    if tag == "iconset":
+        value = ET.SubElement(prop, tag)
+        ET.SubElement(value, "normaloff").text = text
+        value.text = text
+    else:
+        ET.SubElement(prop, tag).text = text
+    return prop
+
+
+def add_button(layout, name, text):
+    item = ET.SubElement(layout, "item")
+    button = ET.SubElement(item, "widget", {"class": "QToolButton", "name": name})
+    add_property(button, "text", "string", text)
+    add_property(button, "toolTip", "string", text)
+    add_property(button, "icon", "iconset", ICON)
+    add_property(button, "command", "string", "@:hello", False)
+    return button
+
+
+def add_menus(root, menu_bar, menus, depth, actions):
+    """top level menus with `depth` nested submenus, actions spread over all menus"""
+    menu_list = []
+    for index in range(menus):
+        parent = menu_bar
+        for level in range(depth):
+            name = "menu_%s_%s" % (index, level)
+            menu = ET.SubElement(parent, "widget", {"class": "QMenu", "name": name})
+            add_property(menu, "title", "string", "Menu %s %s" % (index, level))
+            add_property(menu, "tearOffEnabled", "bool", "true")
+            ET.SubElement(parent, "addaction", name=name)
+            menu_list.append(menu)
+            parent = menu
+
+    for index in range(actions):
+        name = "action_%s" % index
+        menu = menu_list[index % len(menu_list)] if menu_list else menu_bar
+        ET.SubElement(menu, "addaction", name=name)
+        if index % 10 == 9:
+            ET.SubElement(menu, "addaction", name="separator")
+
+        action = ET.SubElement(root, "action", name=name)
+        add_property(action, "text", "string", "action %s" % index)
+        add_property(action, "icon", "iconset", ICON)
+        add_property(action, "command", "string", "@:hello", False)
+        add_property(action, "config", "string", '{"enable": true}', False)
+        if index % 5 == 4:
+            add_property(action, "optionBox", "bool", "true", False)
+            command = "@:OptionsBase.options"
+            add_property(action, "optionBoxCommand", "string", command, False)
+
+
+def generate(
+    path, menus=10, depth=2, actions=1000, shelves=2, shelf_buttons=20, toolbox=10
+):
+    """generate
+
+    :param path: output ui file path
+    :type path: str
+    :param menus: top level menu count, defaults to 10
+    :type menus: int, optional
+    :param depth: nested submenu depth of each top level menu, defaults to 2
+    :type depth: int, optional
+    :param actions: menu action count, defaults to 1000
+    :type actions: int, optional
+    :param shelves: shelf count, defaults to 2
+    :type shelves: int, optional
+    :param shelf_buttons: button count of each shelf, defaults to 20
+    :type shelf_buttons: int, optional
+    :param toolbox: toolbox button count, defaults to 10
+    :type toolbox: int, optional
+    :return: output ui file path
+    :rtype: str
+    """
+    ui = ET.Element("ui", version="4.0")
+    ET.SubElement(ui, "class").text = "UIBot"
+    root = ET.SubElement(ui, "widget", {"class": "QWidget", "name": "UIBot"})
+    layout = ET.SubElement(root, "layout", {"class": "QVBoxLayout", "name": "layout"})
+
+    item = ET.SubElement(layout, "item")
+    attrib = {"class": "QTabWidget", "name": "Shelf_Wgt"}
+    shelf_widget = ET.SubElement(item, "widget", attrib)
+    for index in range(shelves):
+        attrib = {"class": "QWidget", "name": "shelf_%s" % index}
+        shelf = ET.SubElement(shelf_widget, "widget", attrib)
+        title = ET.SubElement(shelf, "attribute", name="title")
+        ET.SubElement(title, "string").text = "Shelf_%s" % index
+        attrib = {"class": "QHBoxLayout", "name": "shelf_layout_%s" % index}
+        shelf_layout = ET.SubElement(shelf, "layout", attrib)
+        for button in range(shelf_buttons):
+            name = "shelf_%s_button_%s" % (index, button)
+            add_button(shelf_layout, name, "button %s" % button)
+
+    item = ET.SubElement(layout, "item")
+    attrib = {"class": "QGroupBox", "name": "Tool_Box_Group"}
+    group = ET.SubElement(item, "widget", attrib)
+    attrib = {"class": "QVBoxLayout", "name": "tool_box_layout"}
+    group_layout = ET.SubElement(group, "layout", attrib)
+    for index in range(toolbox):
+        add_button(group_layout, "tool_%s" % index, "tool %s" % index)
+
+    item = ET.SubElement(layout, "item")
+    attrib = {"class": "QPlainTextEdit", "name": "Module_PTE"}
+    module = ET.SubElement(item, "widget", attrib)
+    add_property(module, "plainText", "string", MODULE)
+
+    menu_bar = ET.SubElement(root, "widget", {"class": "QMenuBar", "name": "Menu_Bar"})
+    add_menus(root, menu_bar, menus, depth, actions)
+
+    ET.SubElement(ui, "resources")
+    ET.SubElement(ui, "connections")
+    ET.ElementTree(ui).write(path, encoding="UTF-8", xml_declaration=True)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("path")
+    parser.add_argument("--menus", type=int, default=10)
+    parser.add_argument("--depth", type=int, default=2)
+    parser.add_argument("--actions", type=int, default=1000)
+    parser.add_argument("--shelves", type=int, default=2)
+    parser.add_argument("--shelf-buttons", type=int, default=20)
+    parser.add_argument("--toolbox", type=int, default=10)
+    args = parser.parse_args()
+    generate(
+        args.path,
+        args.menus,
+        args.depth,
+        args.actions,
+        args.shelves,
+        args.shelf_buttons,
+        args.toolbox,
+    )
+
+
+if __name__ == "__main__":
+    main()
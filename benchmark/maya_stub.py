@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+"""
+recording stub of the maya modules to run the plugin outside maya
+
+every `cmds` and `mel.eval` call is recorded in `RECORDER`,
+`install(cost=0.1)` simulate 0.1ms for each call,
+`RECORDER.faults["menu"] = 1` make the next `menu` create raise RuntimeError,
+`RECORDER.faults["menu -e"] = 1` make the next edit fail.
+"""
+
+# Import future modules
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+# Import built-in modules
+from collections import Counter
+import itertools
+import re
+import sys
+import time
+import types
+
+
+# NOTE the commands return a new ui name on create
+UI_COMMANDS = [
+    "menu",
+    "menuItem",
+    "shelfLayout",
+    "shelfButton",
+    "iconTextButton",
+    "button",
+    "window",
+]
+# NOTE compiled command line of the mel batch backend, skipped without the parent
+BATCH_LINE = re.compile(
+    r'^(?:if \(\$ui\[(\d+)\] != ""\) )?catch\(\$ui\[(\d+)\] = `(\w+)', re.M
+)
+GLOBALS = {
+    "$gMainWindow": "MayaWindow",
+    "$gShelfTopLevel": "MayaWindow|toolBar|ShelfLayout",
+    "$gToolBox": "MayaWindow|toolBar|ToolBox",
+}
+
+
+class Recorder(object):
+    """record the maya calls and track the existing ui names"""
+
+    def __init__(self):
+        self.cost = 0.0
+        self.calls = []
+        self.counter = Counter()
+        self.ui_set = set()
+        self.index = itertools.count()
+        # NOTE command name => count of the next creates to fail
+        self.faults = Counter()
+
+    def reset(self):
+        self.calls = []
+        self.counter = Counter()
+
+    def clear(self):
+        self.reset()
+        self.ui_set = set()
+        self.faults = Counter()
+
+    def fail(self, name):
+        """consume a pending fault of the command"""
+        if self.faults[name] <= 0:
+            return False
+        self.faults[name] -= 1
+        return True
+
+    def record(self, name, args, kwargs):
+        if self.cost:
+            # NOTE busy wait, the sleep granularity is too coarse for sub ms cost
+            end = time.time() + self.cost
+            while time.time() < end:
+                pass
+        self.calls.append((name, args, kwargs))
+        self.counter[name] += 1
+
+    def total(self):
+        return len(self.calls)
+
+
+RECORDER = Recorder()
+
+
+def flag(kwargs, short, long_name):
+    return kwargs.get(short, kwargs.get(long_name))
+
+
+class CmdsStub(types.ModuleType):
+    """`maya.cmds` resolve any command on attribute access"""
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        command = lambda *args, **kwargs: self.call(name, args, kwargs)
+        command.__name__ = name
+        return command
+
+    def call(self, name, args, kwargs):
+        RECORDER.record(name, args, kwargs)
+        ui_set = RECORDER.ui_set
+        if flag(kwargs, "ex", "exists"):
+            if name == "optionVar":
+                return False
+            return bool(args) and args[0] in ui_set
+        if flag(kwargs, "q", "query"):
+            if flag(kwargs, "fpn", "fullPathName"):
+                return GLOBALS["$gShelfTopLevel"]
+            return []
+        if flag(kwargs, "e", "edit"):
+            if RECORDER.fail("%s -e" % name):
+                raise RuntimeError("%s edit failed" % name)
+            return None
+        if name == "deleteUI":
+            for arg in args:
+                names = arg if isinstance(arg, (list, tuple)) else [arg]
+                for ui in names:
+                    if ui not in ui_set:
+                        raise RuntimeError("Object '%s' not found." % ui)
+                    ui_set.discard(ui)
+            return None
+        if name == "scriptJob":
+            return next(RECORDER.index)
+        if name in UI_COMMANDS:
+            if RECORDER.fail(name):
+                raise RuntimeError("%s failed" % name)
+            parent = kwargs.get("parent", kwargs.get("p", "MayaWindow"))
+            base = args[0] if args else name
+            ui = "%s|%s%s" % (parent, base, next(RECORDER.index))
+            ui_set.add(ui)
+            return ui
+        return None
+
+
+def mel_eval(script):
+    RECORDER.record("mel", (script,), {})
+    if "addNewShelfTab" in script:
+        title = script.split('"')[1]
+        ui = "%s|%s" % (GLOBALS["$gShelfTopLevel"], title)
+        RECORDER.ui_set.add(ui)
+        return ui
+    if "global proc string[]" in script:
+        # NOTE the batch create a ui for each command line, "" for the failed one
+        ui_list = []
+        for parent, index, name in BATCH_LINE.findall(script):
+            ui = ""
+            is_skip = parent and not ui_list[int(parent)]
+            if not is_skip and not RECORDER.fail(name):
+                ui = "%s%s" % (name, next(RECORDER.index))
+                RECORDER.ui_set.add(ui)
+            ui_list.append(ui)
+        return ui_list
+    for name, value in GLOBALS.items():
+        if name in script:
+            return value
+    return ""
+
+
+class MGlobal(object):
+    @staticmethod
+    def displayInfo(msg):
+        print(msg)
+
+    @staticmethod
+    def displayWarning(msg):
+        print("Warning:", msg)
+
+    @staticmethod
+    def displayError(msg):
+        print("Error:", msg)
+
+
+class MSyntax(object):
+    kNoArg = 0
+    kString = 1
+    kStringObjects = 2
+    kLong = 3
+    kDouble = 4
+    kBoolean = 5
+
+    def addFlag(self, *args):
+        pass
+
+    def makeFlagMultiUse(self, *args):
+        pass
+
+    def enableEdit(self, *args):
+        pass
+
+    def enableQuery(self, *args):
+        pass
+
+
+def install(cost=0.0):
+    """install the stub maya package into `sys.modules`
+
+    :param cost: simulated milliseconds for each maya call, defaults to 0.0
+    :type cost: float, optional
+    :return: the call recorder
+    :rtype: Recorder
+    """
+    RECORDER.cost = cost / 1000.0
+    if isinstance(sys.modules.get("maya.cmds"), CmdsStub):
+        return RECORDER
+
+    maya = types.ModuleType("maya")
+    cmds = CmdsStub("maya.cmds")
+    mel = types.ModuleType("maya.mel")
+    mel.eval = mel_eval
+    OpenMaya = types.ModuleType("maya.OpenMaya")
+    OpenMaya.MGlobal = MGlobal
+    OpenMaya.MSyntax = MSyntax
+    OpenMayaMPx = types.ModuleType("maya.OpenMayaMPx")
+    OpenMayaMPx.MPxCommand = type("MPxCommand", (object,), {})
+    OpenMayaMPx.asMPxPtr = lambda obj: obj
+    utils = types.ModuleType("maya.utils")
+    utils.executeDeferred = lambda func, *args, **kwargs: func(*args, **kwargs)
+
+    for module in [cmds, mel, OpenMaya, OpenMayaMPx, utils]:
+        setattr(maya, module.__name__.split(".")[-1], module)
+        sys.modules[module.__name__] = module
+    sys.modules["maya"] = maya
+    return RECORDER
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+compare the sequential and the threaded registration of the ui files outside maya
+
+the files are registered by the plugin with and without the prefetch,
+generate them on a network share with `--folder` to measure the remote reads
+
+python benchmark/parallel_parse.py --files 24 --actions 2000 --folder //server/share/tmp
+"""
+
+# Import future modules
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+# Import built-in modules
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+# Import local modules
+from generate_ui import generate
+from run_benchmark import load_plugin
+
+
+def generate_files(folder, count, actions):
+    paths = []
+    for index in range(count):
+        path = os.path.join(folder, "UIBot_%s.ui" % index)
+        paths.append(generate(path, actions=actions))
+    return paths
+
+
+def register(UIBot, recorder, folder, workers, prefetch):
+    """register the ui files with the plugin
+
+    :return: seconds of the registration
+    :rtype: float
+    """
+    mixin = UIBot.UIBotMixin
+    mixin.WORKERS = workers
+    # NOTE parse the xml at each run
+    cache_dir = tempfile.mkdtemp()
+    mixin.IR_CACHE = UIBot.IRCache(cache_dir)
+    if prefetch:
+        # NOTE the prefetch run while maya is starting, never timed
+        UIBot.PREFETCHER.start([folder])
+        UIBot.PREFETCHER.wait()
+    try:
+        recorder.clear()
+        curr = time.time()
+        mixin.register_ui("all")
+        elapsed = time.time() - curr
+        mixin.deregister_ui("all")
+    finally:
+        shutil.rmtree(cache_dir)
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=24)
+    parser.add_argument("--actions", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument(
+        "--folder", help="generate the ui files under the folder, defaults to temp"
+    )
+    args = parser.parse_args()
+
+    UIBot, recorder = load_plugin()
+    mixin = UIBot.UIBotMixin
+    folder = tempfile.mkdtemp(dir=args.folder)
+    results = []
+    try:
+        generate_files(folder, args.files, args.actions)
+        mixin.PATHS = [folder]
+        for prefetch in (False, True):
+            sequential = register(UIBot, recorder, folder, 1, prefetch)
+            threaded = register(UIBot, recorder, folder, args.workers, prefetch)
+            results.append((prefetch, sequential, threaded))
+    finally:
+        shutil.rmtree(folder)
+
+    print("files: %s actions: %s folder: %s" % (args.files, args.actions, folder))
+    for prefetch, sequential, threaded in results:
+        print("prefetched" if prefetch else "read")
+        print("    sequential: %.3fs" % sequential)
+        print("    threaded (%s workers): %.3fs" % (args.workers, threaded))
+        print("    speed-up: %.2fx" % (sequential / threaded))
+
+
+if __name__ == "__main__":
+    main()
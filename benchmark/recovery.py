@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""
+check the registration recover from the failed ui creation with the maya stub
+
+each case make a maya command fail once, the registration must finish,
+the next registration must create the missing ui or apply the lost edit again
+
+python benchmark/recovery.py
+python benchmark/recovery.py --backend mel
+"""
+
+# Import future modules
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+# Import built-in modules
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import traceback
+
+# Import local modules
+from generate_ui import generate
+from run_benchmark import load_plugin
+
+
+# NOTE command name to fail once => description of the case
+CASES = [
+    ("menu", "top level menu"),
+    ("menuItem", "submenu and menu item"),
+    ("shelfButton", "shelf button"),
+    ("iconTextButton", "toolbox button"),
+]
+# NOTE command name to fail the edit once, label to change => description
+EDIT_CASES = [
+    ("menuItem", "Menu 0 1", "submenu edit"),
+    ("iconTextButton", "tool 0", "toolbox button edit"),
+]
+
+
+def register(UIBot, ui_path, registry, scheduler):
+    """register
+
+    :return: type => ui count and the pending operation count
+    :rtype: tuple
+    """
+    mixin = UIBot.UIBotMixin
+    parsers = mixin.PARSERS.get("all")
+    py_dict = UIBot.ModuleDict(mixin.MODULE_CACHE)
+    state = registry.get(ui_path)
+    operations = UIBot.UIParser.build(ui_path, py_dict, parsers, None, state)
+    registry.index(ui_path)
+    scheduler.submit(operations)
+    keys = [parser.TYPE if parser.TYPE else parser.__name__ for parser in parsers]
+    counts = {key: len(registry.get_ui_list(key, ui_path)) for key in keys}
+    return counts, len(scheduler.queue)
+
+
+def check(UIBot, recorder, ui_path, backend, name):
+    """check
+
+    :return: failure messages of the case
+    :rtype: list
+    """
+    recorder.clear()
+    UIBot.Callback.CACHE.clear()
+    scheduler = UIBot.Scheduler(backend)
+    expected, _ = register(UIBot, ui_path, UIBot.UIRegistry(), scheduler)
+
+    recorder.clear()
+    registry = UIBot.UIRegistry()
+    recorder.faults[name] = 1
+    messages = []
+    try:
+        counts, pending = register(UIBot, ui_path, registry, scheduler)
+    except Exception:
+        return ["registration aborted:\n%s" % traceback.format_exc()]
+    if recorder.faults[name]:
+        messages.append("`%s` never called" % name)
+    if pending:
+        messages.append("%s operations left in the queue" % pending)
+    if counts == expected:
+        messages.append("the failed ui is counted as created")
+
+    counts, pending = register(UIBot, ui_path, registry, scheduler)
+    if counts != expected:
+        messages.append("not recovered: %s != %s" % (counts, expected))
+    return messages
+
+
+def check_edit(UIBot, recorder, ui_path, backend, name, label):
+    """check_edit
+
+    :return: failure messages of the case
+    :rtype: list
+    """
+    folder = os.path.dirname(ui_path)
+    edit_path = os.path.join(folder, "edit.ui")
+    shutil.copy(ui_path, edit_path)
+    recorder.clear()
+    UIBot.Callback.CACHE.clear()
+    scheduler = UIBot.Scheduler(backend)
+    registry = UIBot.UIRegistry()
+    expected, _ = register(UIBot, edit_path, registry, scheduler)
+
+    with open(edit_path, "r") as f:
+        content = f.read()
+    text = "%s edited" % label
+    with open(edit_path, "w") as f:
+        f.write(content.replace(">%s<" % label, ">%s<" % text))
+    fault = "%s -e" % name
+    recorder.faults[fault] = 1
+    try:
+        register(UIBot, edit_path, registry, scheduler)
+    except Exception:
+        return ["registration aborted:\n%s" % traceback.format_exc()]
+    messages = []
+    if recorder.faults[fault]:
+        messages.append("`%s` never called" % fault)
+
+    recorder.reset()
+    counts, _ = register(UIBot, edit_path, registry, scheduler)
+    if counts != expected:
+        messages.append("ui count changed: %s != %s" % (counts, expected))
+    if not any(text in repr(call) for call in recorder.calls):
+        messages.append("the lost edit is never applied again")
+    return messages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--backend", default="python", choices=["python", "mel"])
+    args = parser.parse_args()
+
+    UIBot, recorder = load_plugin()
+    folder = tempfile.mkdtemp()
+    failed = False
+    try:
+        ui_path = os.path.join(folder, "recovery.ui")
+        generate(ui_path, 3, 2, 30, 2, 5, 5)
+        for name, description in CASES:
+            messages = check(UIBot, recorder, ui_path, args.backend, name)
+            print("%-24s%s" % (description, "failed" if messages else "ok"))
+            for message in messages:
+                print("    %s" % message)
+            failed = failed or bool(messages)
+        for name, label, description in EDIT_CASES:
+            messages = check_edit(UIBot, recorder, ui_path, args.backend, name, label)
+            print("%-24s%s" % (description, "failed" if messages else "ok"))
+            for message in messages:
+                print("    %s" % message)
+            failed = failed or bool(messages)
+    finally:
+        shutil.rmtree(folder)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+"""
+headless UIBot benchmark with the recording maya stub
+
+report the parse time, maya call count and peak memory of each phase
+
+python benchmark/run_benchmark.py --actions 50000 --depth 3 --cost 0.05
+python benchmark/run_benchmark.py --json result.json
+python benchmark/run_benchmark.py --baseline result.json --tolerance 0.2
+"""
+
+# Import future modules
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+# Import built-in modules
+import argparse
+from collections import OrderedDict
+import gc
+import imp
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+
+try:
+    # Import built-in modules
+    import tracemalloc
+except ImportError:
+    # NOTE python 2 fallback to the max resident set size
+    tracemalloc = None
+
+# Import local modules
+from generate_ui import generate
+import maya_stub
+
+
+DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.join(os.path.dirname(DIR), "UIBot")
+
+
+def load_plugin(cost=0.0):
+    """load the plugin module with the stub maya
+
+    :param cost: simulated milliseconds for each maya call, defaults to 0.0
+    :type cost: float, optional
+    :return: plugin module and the call recorder
+    :rtype: tuple
+    """
+    recorder = maya_stub.install(cost)
+    module = sys.modules.get("UIBot")
+    if module is None:
+        sys.path.insert(0, os.path.join(ROOT, "scripts"))
+        path = os.path.join(ROOT, "plug-ins", "UIBot.py")
+        module = imp.load_source("UIBot", path)
+        sys.modules["UIBot"] = module
+        module.UIBotMixin.PARSERS.scan([os.path.join(ROOT, "config")])
+    return module, recorder
+
+
+class Measure(object):
+    """measure the time, maya calls and peak memory of a phase"""
+
+    # NOTE tracemalloc slow down the parsing a lot, disable it for the timing
+    MEMORY = True
+
+    def __init__(self, recorder, name, results):
+        self.recorder = recorder
+        self.name = name
+        self.results = results
+        self.trace = tracemalloc and self.MEMORY
+
+    def __enter__(self):
+        gc.collect()
+        self.recorder.reset()
+        if self.trace:
+            tracemalloc.start()
+        self.start = time.time()
+        return self
+
+    def __exit__(self, *args):
+        elapsed = time.time() - self.start
+        if self.trace:
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        else:
+            # Import built-in modules
+            import resource
+
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+        self.results[self.name] = {
+            "time": elapsed * 1000,
+            "calls": self.recorder.total(),
+            "commands": dict(self.recorder.counter),
+            "memory": peak / 1024.0 / 1024.0,
+        }
+
+
+def run(ui_path, cost=0.0, backend="python"):
+    """run
+
+    :param ui_path: ui file to benchmark
+    :type ui_path: str
+    :param cost: simulated milliseconds for each maya call, defaults to 0.0
+    :type cost: float, optional
+    :param backend: "python" or "mel" creation backend, defaults to "python"
+    :type backend: str, optional
+    :return: phase name => time(ms), calls, commands, memory(MB)
+    :rtype: dict
+    """
+    UIBot, recorder = load_plugin(cost)
+    UIParser = UIBot.UIParser
+    mixin = UIBot.UIBotMixin
+    parsers = mixin.PARSERS.get("all")
+    recorder.clear()
+    UIBot.Callback.CACHE.clear()
+
+    cache_dir = tempfile.mkdtemp()
+    cache = UIBot.IRCache(cache_dir)
+    py_dict = UIBot.ModuleDict(mixin.MODULE_CACHE)
+    scheduler = UIBot.Scheduler(backend)
+    build = lambda state: UIParser.build(ui_path, py_dict, parsers, None, state, data)
+    results = OrderedDict()
+    try:
+        with Measure(recorder, "parse", results):
+            data = UIParser.load_data(ui_path, parsers, cache)
+        with Measure(recorder, "parse cached", results):
+            UIParser.load_data(ui_path, parsers, cache)
+
+        registry = UIBot.UIRegistry()
+        state = registry.get(ui_path)
+        with Measure(recorder, "plan", results):
+            operations = build(state)
+        with Measure(recorder, "create", results):
+            scheduler.submit(operations)
+
+        with Measure(recorder, "reconcile", results):
+            scheduler.submit(build(state))
+
+        with Measure(recorder, "teardown", results):
+            UIBot.delete_ui(registry.pop_ui(ui_path))
+    finally:
+        shutil.rmtree(cache_dir)
+    return results
+
+
+def report(results):
+    row = "{:<14}{:>12}{:>10}{:>12}"
+    print(row.format("phase", "time(ms)", "calls", "peak(MB)"))
+    for name, result in results.items():
+        time_text = "%.2f" % result["time"]
+        memory_text = "%.2f" % result["memory"]
+        print(row.format(name, time_text, result["calls"], memory_text))
+
+
+def compare(results, baseline, tolerance):
+    """compare with the baseline results
+
+    :return: regression messages
+    :rtype: list
+    """
+    messages = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        for key in ["time", "calls", "memory"]:
+            limit = base[key] * (1 + tolerance)
+            if result[key] > limit and result[key] - base[key] > 1:
+                info = (name, key, base[key], result[key])
+                messages.append("%s %s regressed: %.2f -> %.2f" % info)
+    return messages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ui", help="benchmark the ui file instead of generating")
+    parser.add_argument("--menus", type=int, default=10)
+    parser.add_argument("--depth", type=int, default=2)
+    parser.add_argument("--actions", type=int, default=5000)
+    parser.add_argument("--shelves", type=int, default=4)
+    parser.add_argument("--shelf-buttons", type=int, default=30)
+    parser.add_argument("--toolbox", type=int, default=20)
+    parser.add_argument(
+        "--cost", type=float, default=0.0, help="simulated ms of each maya call"
+    )
+    parser.add_argument("--backend", default="python", choices=["python", "mel"])
+    parser.add_argument(
+        "--no-memory", action="store_true", help="skip tracemalloc for the timing"
+    )
+    parser.add_argument("--json", help="dump the results to the json file")
+    parser.add_argument("--baseline", help="fail if slower than the json results")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+    Measure.MEMORY = not args.no_memory
+
+    folder = tempfile.mkdtemp()
+    try:
+        ui_path = args.ui
+        if not ui_path:
+            ui_path = os.path.join(folder, "synthetic.ui")
+            generate(
+                ui_path,
+                args.menus,
+                args.depth,
+                args.actions,
+                args.shelves,
+                args.shelf_buttons,
+                args.toolbox,
+            )
+        results = run(ui_path, args.cost, args.backend)
+    finally:
+        shutil.rmtree(folder)
+
+    report(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=4)
+
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            messages = compare(results, json.load(f), args.tolerance)
+        for message in messages:
+            print(message)
+        sys.exit(1 if messages else 0)
+
+
+if __name__ == "__main__":
+    main()
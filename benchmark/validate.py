@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+"""
+validate the UIBot ui files outside maya with the recording maya stub
+
+report the xml errors, invalid json config, unresolved callbacks,
+missing icons, the ui creation errors and the parse time of each file
+
+python benchmark/validate.py D:/config
+python benchmark/validate.py D:/config/UIBot.ui --json report.json
+"""
+
+# Import future modules
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+# Import built-in modules
+import argparse
+from collections import OrderedDict
+import imp
+import json
+import os
+import sys
+import time
+import traceback
+
+# Import local modules
+from run_benchmark import load_plugin
+
+
+def collect(paths):
+    """collect
+
+    :param paths: ui files or folders to walk
+    :type paths: list
+    :return: ui file list and the folders of them
+    :rtype: tuple
+    """
+    ui_list = []
+    for path in paths:
+        if os.path.isfile(path):
+            ui_list.append(os.path.abspath(path))
+            continue
+        for root, _, files in os.walk(path):
+            names = sorted(name for name in files if name.endswith(".ui"))
+            ui_list.extend(os.path.join(root, name) for name in names)
+    folders = []
+    for ui_path in ui_list:
+        folder = os.path.dirname(ui_path)
+        if folder not in folders:
+            folders.append(folder)
+    return ui_list, folders
+
+
+def validate(UIBot, ui_path, parsers, py_dict, recorder):
+    """validate
+
+    :param UIBot: plugin module
+    :type UIBot: module
+    :param ui_path: ui file to validate
+    :type ui_path: str
+    :param parsers: parser class list
+    :type parsers: list
+    :param py_dict: callback modules of the folders
+    :type py_dict: ModuleDict
+    :param recorder: stub maya call recorder
+    :type recorder: Recorder
+    :return: parse time(ms), maya calls and the issues
+    :rtype: dict
+    """
+    UIParser = UIBot.UIParser
+    issues = []
+    result = {"time": 0.0, "calls": 0, "issues": issues}
+    start = time.time()
+    try:
+        with open(ui_path, "rb") as f:
+            root = UIBot.ET.fromstring(f.read())
+        data = UIParser.compile_ui(root, parsers, issues)
+    except (IOError, OSError, UIBot.ET.ParseError) as e:
+        issues.append("cannot parse: %s" % e)
+        return result
+    result["time"] = (time.time() - start) * 1000
+
+    py_dict = py_dict.copy()
+    code = data.get("module")
+    if code is not None:
+        module = imp.new_module("__UIBot_Internal_Module__")
+        filename = UIBot.ModuleCache.get_filename(ui_path)
+        try:
+            exec(compile(code, filename, "exec"), module.__dict__)
+        except Exception as e:
+            issues.append("invalid Module_PTE code: %s" % e)
+        py_dict[""] = module
+        # NOTE the build never run the code again
+        data["module"] = None
+    for parser in parsers:
+        key = parser.TYPE if parser.TYPE else parser.__name__
+        tree = data["widgets"][key]["items"]
+        issues.extend(parser(None, py_dict).validate(tree))
+
+    # NOTE create the ui against the stub to catch the parser errors
+    recorder.clear()
+    UIBot.Callback.CACHE.clear()
+    missing = set(UIBot.ICONS.missing)
+    try:
+        operations = UIParser.build(ui_path, py_dict, parsers, None, {}, data)
+    except Exception:
+        issues.append("cannot build:\n%s" % traceback.format_exc())
+        operations = []
+    for operation in operations:
+        try:
+            operation()
+        except Exception:
+            info = (operation.state.get("object_name"), traceback.format_exc())
+            issues.append("cannot create `%s`:\n%s" % info)
+    # NOTE the session report each missing icon once, on the first file using it
+    for name in sorted(UIBot.ICONS.missing - missing):
+        issues.append("missing icon `%s`" % name)
+    result["calls"] = recorder.total()
+    return result
+
+
+def report(results):
+    row = "{:<60}{:>12}{:>10}{:>10}"
+    print(row.format("file", "time(ms)", "calls", "issues"))
+    for ui_path, result in results.items():
+        issues = result["issues"]
+        info = (ui_path, "%.2f" % result["time"], result["calls"], len(issues))
+        print(row.format(*info))
+        for issue in issues:
+            print("    %s" % issue)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("paths", nargs="+", help="ui files or folders to walk")
+    parser.add_argument("--json", help="dump the results to the json file")
+    args = parser.parse_args()
+
+    UIBot, recorder = load_plugin()
+    mixin = UIBot.UIBotMixin
+    ui_list, folders = collect(args.paths)
+    mixin.PARSERS.scan(mixin.PATHS + folders)
+    UIBot.ICONS.update(UIBot.ICONS.get_folders(mixin.PATHS + folders))
+    parsers = mixin.PARSERS.get("all")
+
+    py_dict = UIBot.ModuleDict(mixin.MODULE_CACHE)
+    for py in UIBot.FolderCache().files(folders, ".py"):
+        name = os.path.splitext(os.path.basename(py))[0]
+        py_dict.paths[name] = py
+
+    results = OrderedDict()
+    for ui_path in ui_list:
+        results[ui_path] = validate(UIBot, ui_path, parsers, py_dict, recorder)
+
+    report(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=4)
+    sys.exit(1 if any(result["issues"] for result in results.values()) else 0)
+
+
+if __name__ == "__main__":
+    main()